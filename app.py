@@ -8,8 +8,13 @@ from datetime import datetime, timedelta, date
 import pytz
 import time
 import base64
-from config import TICKERS
-from nse_fetcher import fetch_nse_data, get_nifty_data
+from config import TICKERS, SNAPSHOT_TTL_SECONDS, CHART_TTL_SECONDS, TABLE_STYLE
+from nse_fetcher import get_nifty_data, rank_scanners
+from market_refresher import start_market_refresher, Snapshot
+from cache_policy import get_cache, invalidate
+from correlation import get_correlation
+from pivots import PIVOT_SETS
+from screener import ScreenerError, screen, run_screens, resolve_names
 import os
 import numpy as np # Added for safety
 
@@ -296,8 +301,47 @@ st.markdown("""
 # The code block previously here injected dark CSS which clashed with the Force Light setting.
 
 # --- Caching Data Fetch ---
-@st.cache_data(show_spinner=False)  # Cache indefinitely until manual reset
+# Market-hours TTL + stale-while-revalidate (cache_policy.py): short TTL inside TRADING_HOURS,
+# kept until the next open outside them; expired data is served while one background fetch runs.
+
+# --- Background Refresher (started once per server process, idempotent across reruns) ---
+market_refresher = start_market_refresher(TICKERS)
+
+def fetch_snapshot(changed):
+    """
+    Cache loader. The refresher is the only scheduled fetcher (same grid as this cache), so on expiry
+    its snapshot is adopted, waiting for the tick in progress when it is not newer than the cached one.
+    Only Reset Data (quotes or bars -> scoped refetch on top of the last inputs) and cold starts fetch here.
+    """
+    scope = next(iter(changed)) if len(changed) == 1 else "all"
+    cached = snapshot_cache.value if snapshot_cache.has_value() else None
+    snapshot = market_refresher.get_snapshot()
+    if cached is None and snapshot is not None:
+        return snapshot
+    if snapshot is None or snapshot_cache.changed_datasets() or not market_refresher.is_alive():
+        # Shares any fetch of the same scope already in flight (refresher tick or another session)
+        snapshot = market_refresher.refresh(scope)
+    elif snapshot.version <= cached.version:
+        snapshot = market_refresher.wait_for_newer(cached.version, timeout=SNAPSHOT_TTL_SECONDS)
+    if snapshot is None:
+        return Snapshot(pd.DataFrame(), False, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 0)
+    return snapshot
+
+snapshot_cache = get_cache("market_snapshot", fetch_snapshot, SNAPSHOT_TTL_SECONDS,
+                           validate=lambda snapshot: not snapshot.df.empty, datasets=('quotes', 'bars'))
+chart_cache = get_cache("nifty_chart", lambda changed: get_nifty_data(), CHART_TTL_SECONDS,
+                        validate=lambda chart: len(chart[0]) > 0, datasets=('chart',))
+
+# "Reset Data" targets: the datasets each option invalidates
+REFRESH_SCOPES = {
+    "Quotes": ['quotes'],
+    "Bars": ['bars'],
+    "Chart": ['chart'],
+    "All": ['quotes', 'bars', 'chart'],
+}
+
 def load_data():
+    """Cold start only: full-screen loader while the first snapshot of this process is fetched"""
     # --- Lottie Loading Overlay (Transparent Blur + Animation) ---
     loading_placeholder = st.empty()
     
@@ -369,18 +413,23 @@ def load_data():
     with loading_placeholder:
         st.markdown(loader_html, unsafe_allow_html=True)
     
-    # Force refresh on rerun logic if needed, but cache handles usually
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     # Fetch Data (Animation plays while this runs)
-    df, is_bearish = fetch_nse_data(TICKERS, timestamp)
+    # Single-flight: sessions hitting an empty cache at the same time share one upstream refresh
+    snapshot = snapshot_cache.get()
     
     # Clear Animation
     loading_placeholder.empty()
-    return df, is_bearish, timestamp
+    return snapshot
 
-@st.cache_data(show_spinner=False) # Cache chart data indefinitely until manual reset
 def load_chart_data():
-    return get_nifty_data()
+    return chart_cache.get()
+
+def get_market_snapshot():
+    """Cached snapshot (stale-while-revalidate); only blocks (load_data overlay) on a cold process"""
+    snapshot = snapshot_cache.get() if snapshot_cache.has_value() else load_data()
+    # Every session gets its own copy; the cached frame is shared.
+    # version (the fetch's snapshot id) keys every per-snapshot cache; the timestamp is display-only
+    return snapshot.df.copy(), snapshot.is_bearish, snapshot.timestamp, snapshot.version
 
 # --- Main App Layout ---
 
@@ -388,6 +437,8 @@ def load_chart_data():
 from components.navbar import inject_custom_navbar
 from components.ai_assistant import render_ai_assistant
 from components.about_us import show_about_us
+from components.tables import styled_table
+from trader_zone import trader_picks, LEVERAGE
 
 
 # --- Trader Onboarding Wizard (Modal -- Auto Trigger) ---
@@ -537,30 +588,35 @@ def trader_onboarding():
                 st.rerun()
 
 
-def show_market_scanners(df):
+def show_market_scanners(df, version):
     st.markdown("### 📊 Global Market Overview")
     
-    # Helper for conditional color formatting
-    def color_price_change(val):
-        try:
-            val = float(val)
-            color = '#22c55e' if val > 0 else '#ef4444' if val < 0 else 'inherit'
-            return f'color: {color}'
-        except:
-            return ''
-
-    # DYNAMIC TABLE THEMING (Fix for Black/White Table Consistency)
-    # DYNAMIC TABLE THEMING (Forced Light Mode)
-    table_bg_color = '#ffffff'
-    table_text_color = '#0f172a'
-    table_border = '1px solid #e2e8f0' # Light Grey Border
-
-    props = {
-        'text-align': 'left',
-        'background-color': table_bg_color,
-        'color': table_text_color,
-        'border': table_border # GRID LINES
-    }
+    theme = st.session_state.get('theme', 'Light')
+
+    # Lists are ranked once per snapshot in nse_fetcher; a page view only slices them
+    scanner_lists = rank_scanners(df, version)
+
+    def render_scanner(name, value_col, value_config):
+        # Sliced in the ranked order (best first); labels missing from this frame are skipped
+        rows = df.loc[[i for i in scanner_lists.get(name, []) if i in df.index]]
+        if rows.empty or value_col not in rows.columns:
+            st.caption("No data")
+            return
+        cols = ['Ticker', 'Current Price', value_col] + (['Price Change'] if value_col == 'Percentage Change' else [])
+        signed = [c for c in cols if c in ('Percentage Change', 'Price Change', 'Momentum %')]
+        # Styles are cached per (snapshot, theme, scanner); lean mode leaves formatting to column_config
+        table = rows[cols] if TABLE_STYLE == 'lean' else styled_table(rows[cols], version, theme, name, signed=signed)
+        st.dataframe(
+            table,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                 "Ticker": st.column_config.LinkColumn("Ticker", display_text=r"t=(.*)"),
+                 "Current Price": st.column_config.NumberColumn(format="₹%.2f"),
+                 "Price Change": st.column_config.NumberColumn("Change (₹)", format="₹%.2f"),
+                 value_col: value_config,
+            }
+        )
 
     # 1. Gainers & Losers
     col1, col2 = st.columns(2)
@@ -568,52 +624,76 @@ def show_market_scanners(df):
     with col1:
         st.caption("🚀 Top Gainers")
         if not df.empty:
-            # Select Data
-            gainers = df.nlargest(10, 'Percentage Change')[['Ticker', 'Current Price', 'Percentage Change', 'Price Change']]
-            
-            # Apply Style
-            styled_gainers = gainers.style.set_properties(**props).map(color_price_change, subset=['Price Change', 'Percentage Change'])
-            
-            st.dataframe(
-                styled_gainers,
-                hide_index=True,
-                use_container_width=True,
-                column_config={
-                     "Ticker": st.column_config.LinkColumn("Ticker", display_text=r"t=(.*)"),
-                     "Current Price": st.column_config.NumberColumn(format="₹%.2f"),
-                     "Percentage Change": st.column_config.NumberColumn(format="%.2f%%"),
-                     "Price Change": st.column_config.NumberColumn("Change (₹)", format="₹%.2f"),
-                }
-            )
+            render_scanner('Top Gainers', 'Percentage Change', st.column_config.NumberColumn(format="%.2f%%"))
 
     with col2:
         st.caption("📉 Top Losers")
         if not df.empty:
-            # Select Data
-            losers = df.nsmallest(10, 'Percentage Change')[['Ticker', 'Current Price', 'Percentage Change', 'Price Change']]
-            
-            # Apply Style
-            styled_losers = losers.style.set_properties(**props).map(color_price_change, subset=['Price Change', 'Percentage Change'])
-            
-            st.dataframe(
-                styled_losers,
-                hide_index=True,
-                use_container_width=True,
-                column_config={
-                     "Ticker": st.column_config.LinkColumn("Ticker", display_text=r"t=(.*)"),
-                     "Current Price": st.column_config.NumberColumn(format="₹%.2f"),
-                     "Percentage Change": st.column_config.NumberColumn(format="%.2f%%"),
-                     "Price Change": st.column_config.NumberColumn("Change (₹)", format="₹%.2f"),
-                }
-            )
+            render_scanner('Top Losers', 'Percentage Change', st.column_config.NumberColumn(format="%.2f%%"))
+
+    # 2. Momentum & Volatility
+    col3, col4 = st.columns(2)
+
+    with col3:
+        st.caption("⚡ Momentum (1h Rate of Change)")
+        if not df.empty:
+            render_scanner('Momentum', 'Momentum %', st.column_config.NumberColumn("ROC %", format="%.2f%%"))
+
+    with col4:
+        st.caption("🌪️ Volatility (ATR % of Price)")
+        if not df.empty:
+            render_scanner('Volatility', 'ATR %', st.column_config.NumberColumn("ATR %", format="%.2f%%"))
+
+    # 3. Range Expansion & Volume Surge
+    col5, col6 = st.columns(2)
+
+    with col5:
+        st.caption("📏 Range Expansion (vs 4-Day Avg)")
+        if not df.empty:
+            render_scanner('Range Expansion', 'Range Expansion', st.column_config.NumberColumn("Range x", format="%.2fx"))
+
+    with col6:
+        st.caption("📢 Volume Surge (vs Same Time, Prior Days)")
+        if not df.empty:
+            render_scanner('Volume Surge', 'Volume Surge', st.column_config.NumberColumn("Volume x", format="%.2fx"))
     
     st.markdown("---")
 
-    # Removed Momentum & Volatility as per user request
 
 
 
-def show_trader_zone(df):
+def show_correlation_heatmap(version):
+    """Universe correlation matrix plus beta / relative strength vs Nifty, read from the per-snapshot cache"""
+    result = get_correlation(version)
+    if result is None or result.matrix.empty:
+        return
+
+    st.markdown("### 🧩 Correlation Matrix")
+    chart_template = 'plotly_dark' if st.session_state.get('theme') == 'Dark' else 'plotly_white'
+    labels = [t.replace('.NS', '') for t in result.matrix.columns]
+    fig = px.imshow(
+        result.matrix.to_numpy(), x=labels, y=labels,
+        color_continuous_scale='RdBu_r', zmin=-1, zmax=1, aspect='auto'
+    )
+    fig.update_layout(template=chart_template, height=600, margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+    stats = result.stats.reset_index().rename(columns={'index': 'Ticker'})
+    st.caption("Beta & Relative Strength vs Nifty (15m returns, same window)")
+    st.dataframe(
+        stats.sort_values('Relative Strength', ascending=False),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Correlation": st.column_config.NumberColumn("Nifty Corr", format="%.2f"),
+            "Beta": st.column_config.NumberColumn("Beta", format="%.2f"),
+            "Relative Strength": st.column_config.NumberColumn("Rel. Strength", format="%.2f%%"),
+        }
+    )
+
+
+
+def show_trader_zone(df, version):
     # --- Trader Zone Header with Reset Button ---
     tz_col1, tz_col2 = st.columns([6, 1])
     
@@ -747,76 +827,38 @@ def show_trader_zone(df):
         my_capital = st.number_input("My Capital (₹)", value=10000, step=5000)
     
     with cap_col2:
-        buying_power = my_capital * 4
+        buying_power = my_capital * LEVERAGE
         st.markdown(f"""
         <div style="background-color: rgba(34, 197, 94, 0.1); border: 1px solid #22c55e; padding: 10px; border-radius: 8px; text-align: center;">
-            <span style="color: #15803d; font-weight: 700; font-size: 0.9rem;">Broker Margin: 4x</span><br>
+            <span style="color: #15803d; font-weight: 700; font-size: 0.9rem;">Broker Margin: {LEVERAGE}x</span><br>
             <span style="color: #16a34a; font-weight: 800; font-size: 1.2rem;">Buying Power: ₹{buying_power:,.2f}</span>
         </div>
         """, unsafe_allow_html=True)
 
-    # --- Filtering the Data ---
-    filtered_df = df.copy()
-    
-    # A. View Filter (Intraday Trend)
-    if 'Intraday Trend' in filtered_df.columns:
-        if sentiment_choice == "Bullish":
-            filtered_df = filtered_df[filtered_df['Intraday Trend'].str.contains("Bullish", case=False, na=False)]
-        else:
-            filtered_df = filtered_df[filtered_df['Intraday Trend'].str.contains("Bearish", case=False, na=False)]
-    
-    # B. Ensure Numeric Columns
-    cols = ['Resistance', 'Support', 'Current Price']
-    for c in cols:
-        if c in filtered_df.columns:
-             filtered_df[c] = pd.to_numeric(filtered_df[c], errors='coerce')
-    
-    if all(c in filtered_df.columns for c in cols):
-        # Calculate Spread
-        filtered_df['Spread %'] = (filtered_df['Resistance'] - filtered_df['Support']) / filtered_df['Current Price']
-        
-        # --- REBUILT TRADER ZONE LOGIC (Spec-Based) ---
-        
-        # 1. Leveraged Quantity (Floor Division)
-        # Avoid division by zero
-        filtered_df = filtered_df[filtered_df['Current Price'] > 0]
-        filtered_df['Leveraged Qty'] = (buying_power / filtered_df['Current Price']).astype(int)
-        
-        # 2. Targets & Estimated Profit
-        if sentiment_choice == "Bullish":
-            # Target = Resistance
-            filtered_df['Achieved Price'] = filtered_df['Resistance']
-            
-            # Profit = (Target - Current) * Qty
-            filtered_df['Estimated Profit'] = (filtered_df['Achieved Price'] - filtered_df['Current Price']) * filtered_df['Leveraged Qty']
-            # Zero out negative profit (wrong view)
-            filtered_df.loc[filtered_df['Estimated Profit'] < 0, 'Estimated Profit'] = 0
-            
-            # Risk Amount = Profit * 0.10
-            filtered_df['Stop Loss (Risk)'] = filtered_df['Estimated Profit'] * 0.10
-            
-        else: # Bearish
-            # Target = Support
-            filtered_df['Achieved Price'] = filtered_df['Support']
-            
-            # Profit = (Current - Target) * Qty
-            filtered_df['Estimated Profit'] = (filtered_df['Current Price'] - filtered_df['Achieved Price']) * filtered_df['Leveraged Qty']
-            # Zero out negative profit
-            filtered_df.loc[filtered_df['Estimated Profit'] < 0, 'Estimated Profit'] = 0
-            
-            # Risk Amount = Profit * 0.10
-            filtered_df['Stop Loss (Risk)'] = filtered_df['Estimated Profit'] * 0.10
+    # 2. Target Levels: which level set drives "Achieved Price"
+    level_sets = ['Range'] + [p for p in PIVOT_SETS if f"{p} R1" in df.columns]
+    lvl_col1, lvl_col2 = st.columns([1, 1])
+    with lvl_col1:
+        level_set = st.selectbox(
+            "Target Levels", level_sets, key="tz_level_set",
+            help="Range = intraday support/resistance; pivot sets use the previous session's OHLC"
+        )
+    with lvl_col2:
+        level_depth = st.radio("Level", ["1", "2", "3"], horizontal=True, key="tz_level_depth",
+                               disabled=level_set == 'Range')
 
-        # 3. Use Existing Link from Data Source (User Preferred Method)
-        # This preserves the specific slug format (e.g. stocks/hcl-technologies-ltd?t=HCLTECH)
-        if 'Link' in filtered_df.columns:
-            filtered_df['Ticker'] = filtered_df['Link']
-        
-        # 4. Sort by 'Spread %' (Risk/Reward proxy)
-        if risk_choice == "Risky":
-            target_stocks = filtered_df.nlargest(15, 'Spread %')
-        else:
-            target_stocks = filtered_df.nsmallest(15, 'Spread %')
+    if level_set == 'Range':
+        upper_col, lower_col = 'Resistance', 'Support'
+    else:
+        upper_col, lower_col = f"{level_set} R{level_depth}", f"{level_set} S{level_depth}"
+
+    # --- Picks: candidates sliced once per snapshot, queries memoized on the inputs (trader_zone.py) ---
+    cols = [upper_col, lower_col, 'Current Price']
+    
+    if all(c in df.columns for c in cols):
+        # Spread % ordering (Risky = widest, Safe = tightest), Leveraged Qty, Achieved Price = the
+        # selected R level (Bullish) or S level (Bearish), profit floored at 0, risk = 10% of profit
+        target_stocks = trader_picks(df, version, my_capital, sentiment_choice, risk_choice, upper_col, lower_col)
             
         # 5. Display Configuration
         if not target_stocks.empty:
@@ -864,11 +906,70 @@ def show_trader_zone(df):
         st.error("Essential data (Support/Resistance) missing for calculation.")
 
     st.markdown("---")
+    show_screener(df)
     
 
 
 
-def show_home_dashboard(df, is_bearish, fetch_time):
+def show_screener(df):
+    """Custom screens: expressions compiled once (screener.py) and re-run as vectorized masks on every refresh"""
+    st.markdown("### 🧪 Custom Screener")
+    saved_screens = st.session_state.setdefault('saved_screens', {})
+
+    with st.expander("How to write a screen", expanded=False):
+        st.markdown(
+            'Combine column conditions with `and` / `or` / `not`, e.g. '
+            '`RSI < 30 and Supertrend == "Bullish" and Volume > 1e6` or '
+            '`Trend in ["Bullish"] and Price > Classic_R1`.'
+        )
+        st.caption("Columns: " + ", ".join(f"`{name}`" for name in sorted(resolve_names(tuple(df.columns)))))
+
+    scr_col1, scr_col2 = st.columns([4, 1])
+    with scr_col1:
+        expression = st.text_input("Screen", key="screen_expression",
+                                   placeholder='RSI < 30 and Supertrend == "Bullish" and Volume > 1e6')
+    with scr_col2:
+        screen_name = st.text_input("Name", key="screen_name", placeholder="Oversold bulls")
+
+    display_cols = [c for c in ['Ticker', 'Current Price', 'Percentage Change', 'RSI (5 Min)', 'Supertrend',
+                                'Intraday Trend', 'Volume'] if c in df.columns]
+    column_config = {
+        "Ticker": st.column_config.LinkColumn("Ticker", display_text=r"t=(.*)"),
+        "Current Price": st.column_config.NumberColumn(format="₹%.2f"),
+        "Percentage Change": st.column_config.NumberColumn("Change %", format="%.2f%%"),
+        "RSI (5 Min)": st.column_config.NumberColumn("RSI", format="%.1f"),
+    }
+
+    def linked(rows):
+        rows = rows.copy()
+        if 'Link' in rows.columns:
+            rows['Ticker'] = rows['Link']
+        return rows[display_cols]
+
+    if expression:
+        try:
+            matches = screen(expression, df)
+            st.caption(f"{len(matches)} of {len(df)} stocks match")
+            st.dataframe(linked(matches), hide_index=True, use_container_width=True, column_config=column_config)
+            if st.button("💾 Save Screen", key="save_screen"):
+                saved_screens[screen_name.strip() or expression] = expression
+                st.rerun()
+        except ScreenerError as e:
+            st.error(f"Screen error: {e}")
+
+    # Saved screens re-run against every refreshed snapshot
+    if saved_screens:
+        st.caption("Saved Screens")
+        for name, matches in run_screens(saved_screens, df).items():
+            with st.expander(f"{name} — {len(matches)} matches"):
+                st.code(saved_screens[name], language="python")
+                st.dataframe(linked(matches), hide_index=True, use_container_width=True, column_config=column_config)
+                if st.button("Delete", key=f"delete_screen_{name}"):
+                    del saved_screens[name]
+                    st.rerun()
+
+
+def show_home_dashboard(df, is_bearish, fetch_time, version):
     # Top Layout: Left (Info), Right (Chart)
     top_left, top_right = st.columns([3, 2])
 
@@ -1092,17 +1193,22 @@ def show_home_dashboard(df, is_bearish, fetch_time):
             """,
             unsafe_allow_html=True
         )
+        refresh_scope = st.selectbox("Refresh", list(REFRESH_SCOPES), key="reset_data_scope",
+                                     label_visibility="collapsed")
         if st.button("Reset Data", type="primary", key="reset_data_absolute_fix", use_container_width=True):
-            st.cache_data.clear()
-            st.rerun()
+            # Version bump, rate-limited process-wide; only the caches built from those datasets reload
+            bumped, retry_in = invalidate(REFRESH_SCOPES[refresh_scope])
+            if bumped:
+                with st.spinner(f"Refreshing {', '.join(bumped)}..."):
+                    if 'quotes' in bumped or 'bars' in bumped:
+                        snapshot_cache.load() # Shares any refresh of the same scope already in flight
+                    if 'chart' in bumped:
+                        chart_cache.load()
+                st.rerun()
+            else:
+                st.toast(f"{refresh_scope}: refreshed moments ago, try again in {retry_in:.0f}s")
     
-    # 1. Handle Volume Display (0 -> "--")
-    if 'Volume' in df.columns:
-        # Create a display copy for the dashboard to avoid messing up numeric for other views if shared
-        # But here df is local to this render, so it's okay BUT wait
-        # If we convert to string here, we break numeric sorting if user clicks column header
-        # Best to let st.dataframe handle formatting via column_config, but logic below does string conversion
-        df['Volume'] = df['Volume'].apply(lambda x: "--" if x == 0 else f"{int(x):,}")
+    # 1. Volume Display ("--" for 0, thousands separators) is precomputed in the snapshot schema
 
     # HYPERLINK LOGIC
     if 'Link' in df.columns:
@@ -1114,45 +1220,26 @@ def show_home_dashboard(df, is_bearish, fetch_time):
     # Removed Legacy String Conversion Logic to prevent 'nlargest' TypeError in subsequent calls
     # All formatting is now handled via st.column_config below, keeping df numeric.
 
-    # DYNAMIC TABLE THEMING (Fix for Black Table in Light Mode)
-    # We explicitly pass colors to Pandas Styler, which overrides Streamlit's default canvas theme.
-    # DYNAMIC TABLE THEMING (Forced Light Mode)
-    table_bg_color = '#ffffff'
-    table_text_color = '#0f172a'
-    table_border = '1px solid #e2e8f0'
-
-    styled_df = df.style.set_properties(**{
-        'text-align': 'left',
-        'background-color': table_bg_color,
-        'color': table_text_color,
-        'border': table_border
-    })
-    
     if 'RSI (5 Min)' in df.columns:
-        # RSI Bar Color (Light Indigo) - This specific subset overrides the global property above
         df['RSI (5 Min)'] = df['RSI (5 Min)'].fillna(0).astype(int)
-    
-    # Apply Bar Chart to RSI
-    styled_df = styled_df.bar(subset=['RSI (5 Min)'], align='zero', color='#818cf8', vmin=0, vmax=100)
-
-    def color_vals(val):
-        try:
-            clean_str = str(val).replace('₹','').replace('%','').replace(',','')
-            clean_val = float(clean_str)
-            color = '#22c55e' if clean_val > 0 else '#ef4444' if clean_val < 0 else 'inherit' # Modern Green/Red
-            return f'color: {color}'
-        except:
-            return ''
 
-    styled_df = styled_df.map(color_vals, subset=['Percentage Change', 'Price Change'])
+    # DYNAMIC TABLE THEMING: theme colours, green/red changes and RSI bars (Light Indigo) are computed
+    # once per (snapshot, theme) in components/tables.py. Lean mode skips the Styler entirely.
+    lean_tables = TABLE_STYLE == 'lean'
+    if lean_tables:
+        table = df
+    else:
+        table = styled_table(df, version, st.session_state.get('theme', 'Light'), 'home',
+                             signed=['Percentage Change', 'Price Change'], bars=['RSI (5 Min)'])
 
     st.dataframe(
-        styled_df,
+        table,
         column_order=(
-            "Ticker", "Open Price", "Current Price", "VWAP", 
+            "Ticker", "Open Price", "Current Price", "VWAP",
+            *[c for c in ("VWAP Upper", "VWAP Lower") if c in df.columns],
             "Support", "Resistance",
             "Percentage Change", "Price Change", 
-            "Correlation with Nifty", "RSI (5 Min)", "Supertrend", "Volume",
+            "Correlation with Nifty", "RSI (5 Min)", "Supertrend", "Volume Display",
             "Intraday Trend"
         ),
         column_config={
@@ -1164,13 +1251,16 @@ def show_home_dashboard(df, is_bearish, fetch_time):
             "Open Price": st.column_config.NumberColumn("Open", format="₹%.2f"),
             "Current Price": st.column_config.NumberColumn("Price", format="₹%.2f"),
             "VWAP": st.column_config.NumberColumn("VWAP", format="₹%.2f"),
+            "VWAP Upper": st.column_config.NumberColumn("VWAP +σ", format="₹%.2f"),
+            "VWAP Lower": st.column_config.NumberColumn("VWAP -σ", format="₹%.2f"),
             "Support": st.column_config.NumberColumn("Support", format="₹%.2f"),
             "Resistance": st.column_config.NumberColumn("Resist", format="₹%.2f"),
             "Correlation with Nifty": st.column_config.NumberColumn("Nifty Corr", format="%.2f"),
             "Percentage Change": st.column_config.NumberColumn("Change %", format="%.2f%%"),
             "Price Change": st.column_config.NumberColumn("Change ₹", format="₹%.2f"),
-            "Volume": st.column_config.TextColumn("Volume"),
-            "RSI (5 Min)": st.column_config.NumberColumn("RSI", format="%d"), 
+            "Volume Display": st.column_config.TextColumn("Volume"),
+            "RSI (5 Min)": (st.column_config.ProgressColumn("RSI", format="%d", min_value=0, max_value=100)
+                            if lean_tables else st.column_config.NumberColumn("RSI", format="%d")),
             "Supertrend": st.column_config.TextColumn("Supertrend"),
             "Intraday Trend": st.column_config.TextColumn("Trend"),
         },
@@ -1184,7 +1274,8 @@ def show_home_dashboard(df, is_bearish, fetch_time):
 
     st.markdown("---")
     # Append Scanners to Home Dashboard (Restored)
-    show_market_scanners(df)
+    show_market_scanners(df, version)
+    show_correlation_heatmap(version)
     
     # Info Tip (Moved from Trader Zone)
     st.info("ℹ️ **Tip**: Use Trader Zone for stock deep calculation related to profit and loss.")
@@ -1235,7 +1326,7 @@ def main():
 
     # 1. Load Data
     with st.spinner('Analyzing market data...'):
-        df, is_bearish, fetch_time = load_data()
+        df, is_bearish, fetch_time, version = get_market_snapshot()
         
     # Store for AI Assistant context
     if not df.empty:
@@ -1245,22 +1336,16 @@ def main():
         st.error("Market data unavailable. Please check connection.")
         return
 
-    # Process Numeric Columns
-    numeric_cols = ['Open Price', 'Current Price', 'Price Change', 'Percentage Change', 'RSI (5 Min)', 'VWAP', 'Correlation with Nifty', 'Volume', 'High', 'Low']
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
 
     # --- Multi-Page Routing ---
     page = st.query_params.get("page", "home")
     
     if page == "trader_zone":
-        show_trader_zone(df)
+        show_trader_zone(df, version)
     elif page == "about_us":
         show_about_us()
     else:
-        show_home_dashboard(df, is_bearish, fetch_time)
+        show_home_dashboard(df, is_bearish, fetch_time, version)
         
     # --- Floating AI Assistant ---
     render_ai_assistant()
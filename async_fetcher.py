@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import time
+import pandas as pd
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from config import NSE_BASE_URL, YAHOO_BASE_URL, ASYNC_MAX_CONCURRENCY, NIFTY50_INDEX_PATH, INDICATOR_ENGINE
+from rate_limiter import throttle_async, format_stats
+from nse_fetcher import (
+    empty_quote, parse_live_quote, parse_index_quotes, derive_bars,
+    resample_ohlcv, prepare_nifty_closes, build_ticker_row, backoff_delay, FETCH_PERIOD,
+    attach_scanners, rank_scanners, apply_snapshot_schema, remember_inputs
+)
+from indicator_panel import compute_panel_rows
+from correlation import attach_correlation
+from pivots import attach_pivots
+
+# Browser-like headers: NSE rejects API calls without them (and without its cookies)
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# --- Parsers ---
+
+def parse_chart(payload):
+    """Yahoo v8 chart JSON -> OHLCV DataFrame indexed in IST"""
+    try:
+        result = payload['chart']['result'][0]
+        timestamps = result.get('timestamp') or []
+        quote = result['indicators']['quote'][0]
+    except (KeyError, IndexError, TypeError):
+        return pd.DataFrame()
+
+    if not timestamps: return pd.DataFrame()
+
+    df = pd.DataFrame(
+        {
+            'Open': quote.get('open'),
+            'High': quote.get('high'),
+            'Low': quote.get('low'),
+            'Close': quote.get('close'),
+            'Volume': quote.get('volume'),
+        },
+        index=pd.to_datetime(timestamps, unit='s', utc=True).tz_convert('Asia/Kolkata')
+    )
+    return df.dropna(subset=['Close'])
+
+# --- Engine ---
+
+class AsyncFetchEngine:
+    """
+    One pooled keep-alive session per upstream host (NSE, Yahoo) behind a bounded semaphore.
+    The NSE session keeps a warmed cookie jar so every API call reuses the same handshake.
+    """
+
+    def __init__(self, nse_base=NSE_BASE_URL, yahoo_base=YAHOO_BASE_URL,
+                 concurrency=ASYNC_MAX_CONCURRENCY, max_retries=3, timeout=15):
+        self.nse_base = nse_base.rstrip('/')
+        self.yahoo_base = yahoo_base.rstrip('/')
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.nse = None
+        self.yahoo = None
+        self.semaphore = None
+        self.request_count = 0
+
+    async def __aenter__(self):
+        if aiohttp is None:
+            raise ImportError("The async fetch engine requires aiohttp (pip install aiohttp)")
+
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        def connector():
+            return aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30, ttl_dns_cache=300)
+
+        # unsafe=True lets the jar hold cookies for IP hosts (local stub server)
+        self.nse = aiohttp.ClientSession(
+            connector=connector(), headers=HEADERS, timeout=timeout,
+            cookie_jar=aiohttp.CookieJar(unsafe=True)
+        )
+        self.yahoo = aiohttp.ClientSession(connector=connector(), headers=HEADERS, timeout=timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.nse.close()
+        await self.yahoo.close()
+
+    async def warm_nse(self):
+        """Loads the NSE home page once so the cookie jar holds the session cookies"""
+        try:
+            await throttle_async('nse')
+            async with self.semaphore:
+                self.request_count += 1
+                async with self.nse.get(f"{self.nse_base}/") as resp:
+                    await resp.read()
+        except Exception as e:
+            logging.warning(f"NSE cookie warm-up failed: {e}")
+
+    async def get_json(self, session, url, params=None):
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                # Token first, then a connection slot, so throttled calls don't pin the pool
+                await throttle_async('nse' if session is self.nse else 'yahoo')
+                async with self.semaphore:
+                    self.request_count += 1
+                    async with session.get(url, params=params) as resp:
+                        if resp.status in (401, 403) and session is self.nse:
+                            last_error = RuntimeError(f"NSE returned {resp.status} (cookies expired)")
+                        else:
+                            resp.raise_for_status()
+                            return await resp.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                last_error = e
+
+            # Back off outside the semaphore so waiting retries don't hold a slot
+            if isinstance(last_error, RuntimeError):
+                await self.warm_nse()
+            await asyncio.sleep(backoff_delay(attempt))
+        raise last_error
+
+    async def fetch_index_quotes(self):
+        payload = await self.get_json(self.nse, f"{self.nse_base}{NIFTY50_INDEX_PATH}")
+        return parse_index_quotes(payload)
+
+    async def fetch_equity_quote(self, ticker):
+        payload = await self.get_json(self.nse, f"{self.nse_base}/api/quote-equity", params={'symbol': ticker})
+        if isinstance(payload, dict) and 'priceInfo' in payload:
+            return parse_live_quote(payload)
+        return empty_quote()
+
+    async def fetch_chart(self, symbol, range_=FETCH_PERIOD, interval="5m"):
+        payload = await self.get_json(
+            self.yahoo, f"{self.yahoo_base}/v8/finance/chart/{symbol}",
+            params={'range': range_, 'interval': interval}
+        )
+        return parse_chart(payload)
+
+    async def fetch_all(self, tickers):
+        """All upstream I/O for one refresh -> (quotes, intraday frames, nifty 5m frame)"""
+        await self.warm_nse()
+
+        results = await asyncio.gather(
+            self.fetch_index_quotes(),
+            self.fetch_chart("^NSEI"),
+            *[self.fetch_chart(f"{ticker}.NS") for ticker in tickers],
+            return_exceptions=True
+        )
+        index_quotes, nifty_df, charts = results[0], results[1], results[2:]
+
+        quotes = index_quotes if isinstance(index_quotes, dict) else {}
+        if isinstance(nifty_df, Exception): nifty_df = pd.DataFrame()
+
+        intraday = {}
+        for ticker, chart in zip(tickers, charts):
+            if isinstance(chart, Exception):
+                logging.error(f"Async chart fetch failed for {ticker}: {chart}")
+            elif not chart.empty:
+                intraday[ticker] = chart
+
+        # Only symbols missing from the bulk payload need a per-symbol quote
+        missing = [ticker for ticker in tickers if ticker not in quotes]
+        if missing:
+            fallback = await asyncio.gather(*[self.fetch_equity_quote(t) for t in missing], return_exceptions=True)
+            for ticker, quote in zip(missing, fallback):
+                if isinstance(quote, Exception):
+                    logging.error(f"Async quote fetch failed for {ticker}: {quote}")
+                else:
+                    quotes[ticker] = quote
+
+        return quotes, intraday, nifty_df
+
+# --- Entry Points ---
+
+async def fetch_nse_data_async(tickers, timestamp, max_retries=3, indicator_engine=INDICATOR_ENGINE, version=None,
+                               **engine_kwargs):
+    """
+    Asyncio counterpart of nse_fetcher.fetch_nse_data; returns the same (DataFrame, is_bearish).
+    version keys the per-snapshot caches (fetch_nse_data passes its snapshot id; standalone runs use timestamp).
+    """
+    version = timestamp if version is None else version
+    start = time.perf_counter()
+    async with AsyncFetchEngine(max_retries=max_retries, **engine_kwargs) as engine:
+        quotes, intraday, nifty_df = await engine.fetch_all(tickers)
+        request_count = engine.request_count
+    io_time = time.perf_counter() - start
+
+    # Market trend from the latest Nifty session (same rule as get_nifty_data)
+    is_bearish = False
+    if not nifty_df.empty:
+        last_session = nifty_df[nifty_df.index.normalize() == nifty_df.index[-1].normalize()]['Close']
+        is_bearish = float(last_session.iloc[0]) > float(last_session.iloc[-1])
+    nifty_closes = prepare_nifty_closes(resample_ohlcv(nifty_df, '15min'))
+
+    # Indicators are CPU-only from here on; every ticker gets a quote so no blocking call is made
+    inputs = {ticker: (quotes.get(ticker, empty_quote()), derive_bars(intraday.get(ticker, pd.DataFrame())))
+              for ticker in tickers}
+    if indicator_engine == "panel":
+        results = compute_panel_rows(inputs, timestamp)
+    else:
+        results = [build_ticker_row(ticker, timestamp, quote, bars)
+                   for ticker, (quote, bars) in inputs.items()]
+
+    # Inputs for a later quotes-only / bars-only refresh (those run on the threads path)
+    remember_inputs({ticker: quotes[ticker] for ticker in tickers if ticker in quotes},
+                    {ticker: bars for ticker, (_, bars) in inputs.items() if ticker in intraday},
+                    is_bearish, nifty_closes)
+
+    df = pd.DataFrame(results)
+    attach_correlation(df, {ticker: bars.get('15m', pd.DataFrame()) for ticker, (_, bars) in inputs.items()},
+                       nifty_closes, version)
+    attach_pivots(df, {ticker: bars.get('1d', pd.DataFrame()) for ticker, (_, bars) in inputs.items()})
+    attach_scanners(df, {ticker: bars.get('5m', pd.DataFrame()) for ticker, (_, bars) in inputs.items()})
+    apply_snapshot_schema(df)
+    rank_scanners(df, version)
+
+    logging.info(f"Async success: {len(results)}/{len(tickers)} | {request_count} requests | I/O {io_time:.2f}s")
+    logging.info(f"Rate limiter: {format_stats()}")
+    return df, is_bearish
+
+def run_async_fetch(tickers, timestamp, max_retries=3, indicator_engine=INDICATOR_ENGINE, version=None, **engine_kwargs):
+    """Blocking wrapper so synchronous callers (Streamlit, main.py) can use the async engine"""
+    return asyncio.run(fetch_nse_data_async(tickers, timestamp, max_retries, indicator_engine, version, **engine_kwargs))
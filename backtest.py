@@ -0,0 +1,172 @@
+"""
+Vectorized backtest of the Trader Zone picks over stored 5m bars.
+
+Every session is replayed with the app's rules: at the entry time each ticker gets its
+Intraday Trend (price vs session VWAP) and Support/Resistance, the sentiment filter keeps
+one side, Safe/Risky takes the 15 smallest/largest spreads, and each pick is sized with 4x
+buying power. A trade exits at its target, at the app's 10% stop, or at the session close.
+
+    python backtest.py --sentiment Bullish --risk Safe --capital 10000 --days 365
+    python backtest.py --levels Camarilla --depth 3 --entry 10:00
+"""
+import argparse
+import logging
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+from config import TICKERS
+from bar_store import get_bar_store
+from indicator_panel import build_panel
+from nse_fetcher import session_keys
+from pivots import pivot_levels
+from trader_zone import LEVERAGE, TOP_N, STOP_FRACTION
+
+# --- Trader Zone rules (sizing and stop shared with trader_zone.py) ---
+RANGE_SESSIONS = 5      # Support/Resistance = high/low of the 5-session window
+
+BacktestResult = namedtuple('BacktestResult', ['trades', 'daily', 'summary'])
+
+def load_history(tickers, days=365, interval='5m'):
+    """{ticker: IST OHLCV frame} straight from the bar store"""
+    store = get_bar_store()
+    since = pd.Timestamp.now(tz='Asia/Kolkata') - pd.Timedelta(days=days)
+    frames = {}
+    for ticker in tickers:
+        df = store.load(ticker, interval, since=since)
+        if not df.empty:
+            frames[ticker] = df
+    return frames
+
+def session_frame(values, codes, mask, how):
+    """T x N array -> S x N frame aggregated per session over rows where mask holds"""
+    frame = pd.DataFrame(np.where(mask, values, np.nan))
+    return getattr(frame.groupby(codes), how)()
+
+def first_row(hit, codes, rows):
+    """Per session, the first row where hit holds (inf where it never does)"""
+    return pd.DataFrame(np.where(hit, rows, np.inf)).groupby(codes).min()
+
+def run_backtest(frames, sentiment="Bullish", risk="Safe", capital=10000, entry="09:30",
+                 levels="Range", depth=1):
+    """Replays the Trader Zone rules over every stored session -> BacktestResult"""
+    index, tickers, panel, valid = build_panel(frames)
+    if not tickers:
+        return BacktestResult(pd.DataFrame(), pd.Series(dtype='float64'), {})
+
+    sessions = session_keys(index)
+    codes, session_days = pd.factorize(sessions)
+    session_days = pd.Index(session_days.date, name='Session')
+    time_of_day = index - index.normalize()
+    bar_length = pd.Timedelta(minutes=5)
+    entry_at = pd.Timedelta(hours=int(entry[:2]), minutes=int(entry[3:]))
+
+    # Bars closed by the entry time form the "snapshot"; later bars are the trade
+    before = np.asarray(time_of_day + bar_length <= entry_at)[:, None] & valid
+    after = np.asarray(time_of_day >= entry_at)[:, None] & valid
+    high, low, close, volume = panel['High'], panel['Low'], panel['Close'], panel['Volume']
+
+    # --- Snapshot at entry: price, session VWAP, Support / Resistance ---
+    price = session_frame(close, codes, before, 'last')
+    vwap = session_frame(close * volume, codes, before, 'sum') / session_frame(volume, codes, before, 'sum')
+
+    if levels == "Range":
+        day_high = session_frame(high, codes, valid, 'max')
+        day_low = session_frame(low, codes, valid, 'min')
+        prior = RANGE_SESSIONS - 1
+        upper = np.fmax(day_high.shift(1).rolling(prior, min_periods=1).max(),
+                        session_frame(high, codes, before, 'max'))
+        lower = np.fmin(day_low.shift(1).rolling(prior, min_periods=1).min(),
+                        session_frame(low, codes, before, 'min'))
+    else:
+        # Pivot sets from the previous session's OHLC, like pivots.pivot_table
+        prev_high = session_frame(high, codes, valid, 'max').shift(1)
+        prev_low = session_frame(low, codes, valid, 'min').shift(1)
+        prev_close = session_frame(close, codes, valid, 'last').shift(1)
+        table = pivot_levels(prev_high.to_numpy(), prev_low.to_numpy(), prev_close.to_numpy())
+        upper = pd.DataFrame(table[f"{levels} R{depth}"], index=price.index)
+        lower = pd.DataFrame(table[f"{levels} S{depth}"], index=price.index)
+
+    # --- Selection: sentiment filter, then Safe/Risky spread ordering ---
+    bullish = sentiment == "Bullish"
+    trend_ok = (price > vwap) if bullish else ~(price > vwap)
+    target = upper if bullish else lower
+    direction = 1.0 if bullish else -1.0
+    # A pick whose target sits on the wrong side projects zero profit; it is not traded
+    edge = (target - price) * direction > 0
+    eligible = trend_ok & edge & price.gt(0) & upper.notna() & lower.notna()
+
+    spread = ((upper - lower) / price).where(eligible)
+    ranks = spread.rank(axis=1, method='first', ascending=(risk != "Risky"))
+    picked = ranks <= TOP_N
+
+    # --- Trade: target vs stop, first touch after entry; otherwise out at the session close ---
+    stop = price - direction * STOP_FRACTION * (target - price).abs()
+    target_rows = target.to_numpy()[codes]
+    stop_rows = stop.to_numpy()[codes]
+    rows = np.arange(len(index))[:, None]
+    with np.errstate(invalid='ignore'):
+        hits_target = after & ((high >= target_rows) if bullish else (low <= target_rows))
+        hits_stop = after & ((low <= stop_rows) if bullish else (high >= stop_rows))
+    first_target = first_row(hits_target, codes, rows)
+    first_stop = first_row(hits_stop, codes, rows)
+    close_out = session_frame(close, codes, after, 'last')
+
+    # Same bar touching both: assume the stop came first
+    target_hit = (first_target < first_stop) & np.isfinite(first_target)
+    stopped = ~target_hit & np.isfinite(first_stop)
+    exit_price = close_out.where(~stopped, stop).where(~target_hit, target)
+
+    qty = np.floor(capital * LEVERAGE / price)
+    pnl = ((exit_price - price) * direction * qty).where(picked & exit_price.notna())
+
+    # --- Results ---
+    traded = pnl.notna()
+    trades = pd.DataFrame({
+        'Session': session_days[np.nonzero(traded.to_numpy())[0]],
+        'Ticker': np.asarray(tickers)[np.nonzero(traded.to_numpy())[1]],
+        'Entry': price.to_numpy()[traded],
+        'Target': target.to_numpy()[traded],
+        'Stop': stop.to_numpy()[traded],
+        'Exit': exit_price.to_numpy()[traded],
+        'Qty': qty.to_numpy()[traded],
+        'P&L': pnl.to_numpy()[traded],
+        'Target Hit': target_hit.to_numpy()[traded],
+    })
+
+    daily = pd.Series(pnl.sum(axis=1, min_count=1).fillna(0.0).to_numpy(), index=session_days, name='P&L')
+    equity = daily.cumsum()
+    drawdown = equity - equity.cummax().clip(lower=0)
+    summary = {
+        'sessions': len(daily),
+        'trades': len(trades),
+        'total_pnl': round(float(daily.sum()), 2),
+        'hit_rate': round(float(trades['Target Hit'].mean()) * 100, 2) if len(trades) else 0.0,
+        'win_rate': round(float((trades['P&L'] > 0).mean()) * 100, 2) if len(trades) else 0.0,
+        'avg_trade': round(float(trades['P&L'].mean()), 2) if len(trades) else 0.0,
+        'max_drawdown': round(float(drawdown.min()), 2) if len(daily) else 0.0,
+    }
+    return BacktestResult(trades, daily, summary)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the Trader Zone picks on stored bars")
+    parser.add_argument("--sentiment", choices=["Bullish", "Bearish"], default="Bullish")
+    parser.add_argument("--risk", choices=["Safe", "Risky"], default="Safe")
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--days", type=int, default=365, help="history to replay from the bar store")
+    parser.add_argument("--entry", default="09:30", help="IST time the picks are made (HH:MM)")
+    parser.add_argument("--levels", choices=["Range", "Classic", "Fibonacci", "Camarilla"], default="Range")
+    parser.add_argument("--depth", type=int, choices=[1, 2, 3], default=1, help="pivot level (R1/S1 .. R3/S3)")
+    parser.add_argument("--trades", help="optional CSV path for the trade list")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s', force=True)
+
+    frames = load_history(TICKERS, args.days)
+    logging.info(f"Loaded {len(frames)}/{len(TICKERS)} tickers from the bar store")
+    result = run_backtest(frames, args.sentiment, args.risk, args.capital, args.entry, args.levels, args.depth)
+
+    for key, value in result.summary.items():
+        print(f"{key:>14}: {value}")
+    if args.trades and not result.trades.empty:
+        result.trades.to_csv(args.trades, index=False)
+        print(f"Trades written to {args.trades}")
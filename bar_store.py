@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import threading
+import logging
+import pandas as pd
+from config import BAR_STORE_PATH, BAR_STORE_RETENTION_DAYS
+
+# --- Local OHLCV Bar Store (SQLite, one row per symbol/interval/bar) ---
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,   -- bar open, epoch seconds (UTC)
+    open     REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, interval, ts)
+) WITHOUT ROWID
+"""
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class BarStore:
+    """
+    Persistent bar cache read before every Yahoo call.
+    Only bars newer than the last stored timestamp are fetched and appended.
+    """
+
+    def __init__(self, path=BAR_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        # One shared connection guarded by a lock: fetch workers and Streamlit sessions share the store
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self.last_prune_date = None
+
+    def last_timestamps(self, symbols, interval='5m'):
+        """{symbol: pd.Timestamp (IST)} for symbols that have stored bars"""
+        if not symbols: return {}
+        marks = ",".join("?" * len(symbols))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT symbol, MAX(ts) FROM bars WHERE interval = ? AND symbol IN ({marks}) GROUP BY symbol",
+                [interval, *symbols]
+            ).fetchall()
+        return {
+            symbol: pd.Timestamp(ts, unit='s', tz='UTC').tz_convert('Asia/Kolkata')
+            for symbol, ts in rows if ts is not None
+        }
+
+    def append(self, symbol, interval, df):
+        """Upserts bars; the last stored bar may have been in progress, so overlaps replace it"""
+        if df is None or df.empty: return 0
+        df = df.dropna(subset=['Close'])
+        index = df.index if df.index.tz is not None else df.index.tz_localize('UTC')
+        epochs = (index.tz_convert('UTC').as_unit('s').asi8).tolist()
+        rows = [
+            (symbol, interval, ts, *[None if pd.isna(v) else float(v) for v in values])
+            for ts, values in zip(epochs, df.reindex(columns=COLUMNS).itertuples(index=False, name=None))
+        ]
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+        return len(rows)
+
+    def load(self, symbol, interval='5m', sessions=None, since=None):
+        """Stored bars as an IST-indexed OHLCV frame, optionally limited to the last N sessions"""
+        query = "SELECT ts, open, high, low, close, volume FROM bars WHERE symbol = ? AND interval = ?"
+        params = [symbol, interval]
+        if since is not None:
+            query += " AND ts >= ?"
+            params.append(int(pd.Timestamp(since).timestamp()))
+        elif sessions is not None:
+            # Calendar-day bound generous enough to span weekends/holidays, trimmed to sessions below
+            query += " AND ts >= (SELECT MAX(ts) FROM bars WHERE symbol = ? AND interval = ?) - ?"
+            params += [symbol, interval, (sessions * 2 + 4) * 86400]
+        query += " ORDER BY ts"
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        if not rows: return pd.DataFrame(columns=COLUMNS)
+
+        df = pd.DataFrame(rows, columns=['ts'] + COLUMNS)
+        df.index = pd.to_datetime(df.pop('ts'), unit='s', utc=True).dt.tz_convert('Asia/Kolkata')
+        df.index.name = None
+
+        if sessions is not None:
+            session_dates = df.index.normalize()
+            keep = session_dates.unique()[-sessions:]
+            df = df[session_dates.isin(keep)]
+        return df
+
+    def prune(self, retention_days=BAR_STORE_RETENTION_DAYS):
+        """Drops bars older than the retention window (kept long enough for backtests)"""
+        cutoff = int((pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=retention_days)).timestamp())
+        with self.lock:
+            deleted = self.conn.execute("DELETE FROM bars WHERE ts < ?", (cutoff,)).rowcount
+            self.conn.commit()
+        if deleted:
+            logging.info(f"Bar store pruned {deleted} bars older than {retention_days} days")
+        return deleted
+
+    def prune_if_due(self):
+        """Runs prune() at most once per calendar day"""
+        today = pd.Timestamp.now(tz='Asia/Kolkata').date()
+        if self.last_prune_date != today:
+            self.last_prune_date = today
+            self.prune()
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+def get_bar_store():
+    """Process-wide store instance (opened lazily on first use)"""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = BarStore()
+        return _STORE
@@ -0,0 +1,152 @@
+import threading
+import logging
+import time
+from datetime import timedelta
+from config import INVALIDATION_COOLDOWN_SECONDS
+from market_hours import now_ist, is_trading_time, session_start_dt, next_session_start
+from single_flight import SingleFlight
+
+# --- Market-Hours Cache Policy ---
+# Inside TRADING_HOURS a cached dataset lives for a short TTL, expiring on a fixed grid from the
+# session open (09:15, 09:17, ... for a 120s TTL) so upstream is hit on a predictable schedule.
+# Outside the session it is kept until the next open. Expired data is still served while one
+# background thread revalidates it, so only the very first load of a process ever blocks.
+
+def market_ttl(trading_ttl, now=None):
+    """Seconds until the cached value should be revalidated"""
+    now = now or now_ist()
+    if is_trading_time(now):
+        elapsed = (now - session_start_dt(now.date())).total_seconds()
+        return max(trading_ttl - elapsed % trading_ttl, 1.0)
+    return max((next_session_start(now) - now).total_seconds(), 1.0)
+
+# --- Dataset Versions & Scoped Invalidation ---
+# Each upstream dataset has a process-wide version counter. Invalidating one bumps its counter;
+# a cache built from that dataset sees the mismatch and reloads just the changed part in the
+# background. Forced invalidations are limited to one per dataset per cooldown for the whole
+# process, so repeated clicks in one session cannot queue full rescans for everyone else.
+
+DATASETS = ['quotes', 'bars', 'chart']
+
+_VERSIONS = dict.fromkeys(DATASETS, 0)
+_LAST_INVALIDATED = {}
+_VERSIONS_LOCK = threading.Lock()
+
+def dataset_versions(datasets=DATASETS):
+    with _VERSIONS_LOCK:
+        return {name: _VERSIONS[name] for name in datasets}
+
+def invalidate(datasets):
+    """
+    Bumps the version of each dataset that is out of its cooldown.
+    -> (invalidated datasets, seconds until the first refused one may be invalidated again)
+    """
+    now = time.monotonic()
+    bumped, retry_in = [], 0.0
+    with _VERSIONS_LOCK:
+        for name in datasets:
+            wait = _LAST_INVALIDATED.get(name, -float('inf')) + INVALIDATION_COOLDOWN_SECONDS[name] - now
+            if wait > 0:
+                retry_in = max(retry_in, wait)
+                continue
+            _VERSIONS[name] += 1
+            _LAST_INVALIDATED[name] = now
+            bumped.append(name)
+    if bumped:
+        logging.info(f"Invalidated {', '.join(bumped)}")
+    return bumped, retry_in
+
+_MISSING = object()
+
+class StaleWhileRevalidate:
+    """
+    One cached dataset with the market-hours TTL.
+    get() never blocks once a value exists: an expired value is returned as-is and a single
+    background refresh replaces it. A load that yields nothing usable (validate() False) is
+    kept but retried after retry_after seconds instead of waiting for the next open.
+    With `datasets`, the value is also stale once any of their versions moves, and the loader
+    is called with the set of datasets to refetch (all of them on expiry or a cold start).
+    """
+
+    def __init__(self, name, loader, trading_ttl, validate=None, retry_after=30, datasets=()):
+        self.name = name
+        self.loader = loader
+        self.trading_ttl = trading_ttl
+        self.validate = validate or (lambda value: value is not None)
+        self.retry_after = retry_after
+        self.datasets = tuple(datasets)
+        self.versions = {}
+        self.value = _MISSING
+        self.loaded_at = None
+        self.expires_at = 0.0
+        self.revalidating = False
+        self.lock = threading.Lock()
+        self.flight = SingleFlight()
+
+    def has_value(self):
+        return self.value is not _MISSING
+
+    def is_stale(self):
+        return time.time() >= self.expires_at or bool(self.changed_datasets())
+
+    def changed_datasets(self):
+        current = dataset_versions(self.datasets)
+        return {name for name, version in current.items() if self.versions.get(name) != version}
+
+    def load(self):
+        """Blocking fetch (shared by concurrent callers) that replaces the cached value"""
+        return self.flight.do(self.name, self._load)
+
+    def _load(self):
+        if not self.datasets:
+            value = self.loader()
+        else:
+            # Versions are read before the fetch so a bump during it triggers another reload
+            versions = dataset_versions(self.datasets)
+            changed = self.changed_datasets()
+            if not self.has_value() or time.time() >= self.expires_at or not changed:
+                changed = set(self.datasets)
+            value = self.loader(changed)
+            self.versions = versions
+        now = now_ist()
+        ttl = market_ttl(self.trading_ttl, now) if self.validate(value) else self.retry_after
+        self.value, self.loaded_at, self.expires_at = value, now, time.time() + ttl
+        logging.info(f"Cache '{self.name}' loaded; next revalidation in {timedelta(seconds=int(ttl))}")
+        return value
+
+    def get(self):
+        value = self.value
+        if value is _MISSING:
+            return self.load()
+        if self.is_stale():
+            self.revalidate()
+        return value
+
+    def revalidate(self):
+        """Starts one background refresh unless one is already running"""
+        with self.lock:
+            if self.revalidating: return
+            self.revalidating = True
+        threading.Thread(target=self._revalidate, name=f"swr-{self.name}", daemon=True).start()
+
+    def _revalidate(self):
+        try:
+            self.load()
+        except Exception as e:
+            # Keep serving the stale value; try again after a short pause
+            self.expires_at = time.time() + self.retry_after
+            logging.error(f"Cache '{self.name}' revalidation failed: {e}")
+        finally:
+            with self.lock:
+                self.revalidating = False
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_cache(name, loader, trading_ttl, **kwargs):
+    """Process-wide cache per name (module state survives Streamlit reruns, unlike app.py globals)"""
+    with _CACHES_LOCK:
+        cache = _CACHES.get(name)
+        if cache is None:
+            cache = _CACHES[name] = StaleWhileRevalidate(name, loader, trading_ttl, **kwargs)
+        return cache
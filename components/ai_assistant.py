@@ -11,6 +11,7 @@ try:
     from config import N8N_WEBHOOK_URL
 except ImportError:
     N8N_WEBHOOK_URL = ""
+from nse_fetcher import export_frame
 
 def get_ai_response(prompt):
     """Sends prompt to n8n Webhook and returns response."""
@@ -45,7 +46,7 @@ def get_ai_response(prompt):
             df = st.session_state['latest_market_data']
             if not df.empty:
                 # Convert to JSON records format for n8n (list of dictionaries)
-                stock_records = df.head(50).to_dict('records')
+                stock_records = export_frame(df.head(50)).to_dict('records')
                 payload["market_data"] = stock_records
         
         response = requests.post(N8N_WEBHOOK_URL, json=payload, timeout=30)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# --- Cached Table Styling ---
+# The Styler work for a table (theme props, green/red signed values, RSI bars) is done once per
+# (snapshot version, theme) as a frame of CSS strings. Reruns only wrap that frame in a one-step
+# Styler, so typing in a widget no longer re-parses every cell.
+
+TABLE_THEMES = {
+    'Light': {'text-align': 'left', 'background-color': '#ffffff', 'color': '#0f172a', 'border': '1px solid #e2e8f0'},
+    'Dark':  {'text-align': 'left', 'background-color': '#0f172a', 'color': '#e2e8f0', 'border': '1px solid #334155'},
+}
+POSITIVE_COLOR = '#22c55e'  # Modern Green
+NEGATIVE_COLOR = '#ef4444'  # Modern Red
+BAR_COLOR = '#818cf8'       # Light Indigo
+
+def _css(props):
+    return " ".join(f"{key}: {value};" for key, value in props.items())
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def cell_styles(version, theme, name, signed, bars, _df):
+    """
+    CSS per cell for one table of one snapshot (name tells the tables of a snapshot apart).
+    signed columns are coloured by sign; bars columns get a 0-100 bar.
+    """
+    props = TABLE_THEMES.get(theme, TABLE_THEMES['Light'])
+    base = _css(props)
+    styles = pd.DataFrame(base, index=_df.index, columns=_df.columns)
+
+    for column in signed:
+        if column not in _df.columns: continue
+        values = pd.to_numeric(_df[column], errors='coerce').to_numpy()
+        colors = np.select([values > 0, values < 0], [POSITIVE_COLOR, NEGATIVE_COLOR], default=props['color'])
+        styles[column] = [f"{base} color: {color};" for color in colors]
+
+    for column in bars:
+        if column not in _df.columns: continue
+        width = np.clip(pd.to_numeric(_df[column], errors='coerce').fillna(0).to_numpy(), 0, 100)
+        styles[column] = [f"{base} width: 10em; background: linear-gradient(90deg, {BAR_COLOR} {w:.1f}%, "
+                          f"transparent {w:.1f}%);" for w in width]
+    return styles
+
+def styled_table(df, version, theme, name, signed=(), bars=()):
+    """df wrapped in a Styler that replays the cached CSS for (version, theme, name)"""
+    styles = cell_styles(version, theme, name, tuple(signed), tuple(bars), df)
+    if not (styles.index.equals(df.index) and styles.columns.equals(df.columns)):
+        # Same key, different frame (e.g. a column toggled mid-snapshot): unstyled cells rather than an error
+        styles = styles.reindex(index=df.index, columns=df.columns).fillna("")
+    return df.style.apply(lambda _: styles, axis=None)
@@ -1,6 +1,7 @@
 import os
 import logging
 from nsepython import nsefetch
+import rate_limiter
 
 # --- ABSOLUTE PATH SETUP ---
 # This gets the folder where config.py lives (e.g., /Users/ritesh.../nse_automation)
@@ -17,6 +18,25 @@ ICON_BEAR = os.path.join(BASE_DIR, 'Charts', 'Bear.png')
 os.makedirs(os.path.dirname(EXCEL_FILE), exist_ok=True)
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
+# --- LOCAL BAR STORE ---
+# SQLite cache of OHLCV bars; refreshes only download bars newer than the last stored one
+USE_BAR_STORE = True
+BAR_STORE_PATH = os.path.join(BASE_DIR, 'data', 'bars.sqlite')
+BAR_STORE_RETENTION_DAYS = 365
+
+# --- INDICATOR ENGINE ---
+# 'per_ticker' = indicators computed inside each fetch worker; RSI/VWAP/Supertrend run as
+#                incremental state when PER_TICKER_INCREMENTAL_STATE is on
+# 'panel'      = fetch workers do I/O only; every indicator is recomputed from the fetched window
+#                for the whole universe in one vectorized pass (no incremental state)
+INDICATOR_ENGINE = os.environ.get("NSE_INDICATOR_ENGINE", "per_ticker")
+
+# per_ticker engine only: keep RSI/VWAP/Supertrend as running per-ticker state, updated with newly arrived bars
+PER_TICKER_INCREMENTAL_STATE = True
+
+# Rows per pre-ranked scanner list (momentum, volatility, range expansion, volume surge, gainers/losers)
+SCANNER_TOP_N = 10
+
 # Trading hours (IST)
 TRADING_HOURS = {
     'start': '09:15',
@@ -24,6 +44,28 @@ TRADING_HOURS = {
     'frequency': 'hourly'
 }
 
+# VWAP is anchored to the session open (TRADING_HOURS['start']) and resets every day.
+# Set to a multiplier (e.g. 1 or 2) to add 'VWAP Upper' / 'VWAP Lower' standard-deviation bands.
+VWAP_BAND_STDEV = float(os.environ.get("NSE_VWAP_BAND_STDEV", 0)) or None
+
+# Local NSE holiday calendar (one YYYY-MM-DD per line)
+HOLIDAY_FILE = os.path.join(BASE_DIR, 'nse_holidays.txt')
+
+# App cache TTLs inside TRADING_HOURS (seconds); outside the session data is kept until the next open.
+# The background refresher fetches on the SNAPSHOT_TTL_SECONDS grid from the open; the snapshot cache only adopts its results.
+SNAPSHOT_TTL_SECONDS = int(os.environ.get("SNAPSHOT_TTL_SECONDS", 120))
+CHART_TTL_SECONDS = int(os.environ.get("CHART_TTL_SECONDS", 300))
+
+# Minimum gap between forced refreshes of one dataset, process-wide (seconds)
+INVALIDATION_COOLDOWN_SECONDS = {
+    'quotes': int(os.environ.get("QUOTES_INVALIDATION_COOLDOWN", 15)),
+    'bars':   int(os.environ.get("BARS_INVALIDATION_COOLDOWN", 60)),
+    'chart':  int(os.environ.get("CHART_INVALIDATION_COOLDOWN", 30)),
+}
+
+# Table rendering: 'styled' = cached pandas Styler (colours, RSI bars), 'lean' = column_config formatting only
+TABLE_STYLE = os.environ.get("NSE_TABLE_STYLE", "styled")
+
 # --- AI AGENT CONFIG ---
 # Replace with your actual n8n Webhook URL
 N8N_WEBHOOK_URL = "https://n8n.ritesh-ai-automation.in/webhook/562c7120-c504-4664-9b0a-190154334bb4"
@@ -31,12 +73,37 @@ N8N_WEBHOOK_URL = "https://n8n.ritesh-ai-automation.in/webhook/562c7120-c504-466
 # Retry settings
 MAX_RETRIES = 3
 
+# --- FETCH ENGINE ---
+# 'threads' = blocking nsepython/yfinance calls on a thread pool
+# 'async'   = asyncio engine with pooled keep-alive sessions (requires aiohttp)
+FETCH_ENGINE = os.environ.get("NSE_FETCH_ENGINE", "threads")
+ASYNC_MAX_CONCURRENCY = 32
+
+# --- RATE LIMITS ---
+# Process-wide token buckets shared by every NSE/Yahoo caller (requests per second, burst size)
+RATE_LIMITS = {
+    'nse':   {'rate': float(os.environ.get("NSE_RATE_LIMIT", 3)),    'burst': int(os.environ.get("NSE_RATE_BURST", 5))},
+    'yahoo': {'rate': float(os.environ.get("YAHOO_RATE_LIMIT", 10)), 'burst': int(os.environ.get("YAHOO_RATE_BURST", 20))},
+}
+rate_limiter.configure(RATE_LIMITS)
+
+# Upstream hosts (overridable so the async engine can be benchmarked against a local stub)
+NSE_BASE_URL = os.environ.get("NSE_BASE_URL", "https://www.nseindia.com")
+YAHOO_BASE_URL = os.environ.get("YAHOO_BASE_URL", "https://query1.finance.yahoo.com")
+
 # --- DYNAMIC TICKER LOGIC ---
 
+NIFTY50_INDEX_PATH = "/api/equity-stockIndices?index=NIFTY%2050"
+NIFTY50_INDEX_URL = NSE_BASE_URL + NIFTY50_INDEX_PATH
+
+def fetch_index_payload(url=NIFTY50_INDEX_URL):
+    """Raw constituents payload (symbols + live lastPrice/open/change/pChange/volume)"""
+    rate_limiter.throttle('nse')
+    return nsefetch(url)
+
 def get_nifty50_tickers():
     try:
-        url = "https://www.nseindia.com/api/equity-stockIndices?index=NIFTY%2050"
-        payload = nsefetch(url)
+        payload = fetch_index_payload()
         
         if 'data' in payload:
             live_tickers = [item['symbol'] for item in payload['data'] if item['priority'] == 0]
@@ -0,0 +1,91 @@
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+import pandas as pd
+
+# --- Universe Correlation & Beta ---
+# Every ticker's 15m closes and ^NSEI are aligned on one shared intraday clock, then the full
+# correlation matrix, beta and relative strength come out of a single vectorized pass.
+# Results are cached per snapshot version (the fetch's monotonic snapshot id) so the app never recomputes them.
+
+BENCHMARK = '^NSEI'
+MIN_BARS = 10
+CACHE_VERSIONS = 4
+
+CorrelationResult = namedtuple('CorrelationResult', ['matrix', 'stats', 'version'])
+
+_RESULTS = OrderedDict()
+_RESULTS_LOCK = threading.Lock()
+
+def align_closes(frames, benchmark):
+    """
+    {ticker: 15m OHLCV frame} + benchmark close series -> T x (N+1) close frame on the benchmark's clock.
+    A ticker missing a bar carries its last close (zero return), like a flat no-trade bar.
+    """
+    closes = {t: f['Close'] for t, f in frames.items() if not f.empty and 'Close' in f.columns}
+    if benchmark.empty or not closes:
+        return pd.DataFrame()
+    panel = pd.DataFrame(closes)
+    panel = panel.reindex(panel.index.union(benchmark.index)).sort_index().ffill()
+    panel[BENCHMARK] = benchmark
+    return panel.loc[benchmark.index]
+
+def compute_stats(closes):
+    """Log returns -> (N x N correlation matrix, per-ticker Correlation / Beta / Relative Strength)"""
+    returns = np.log(closes).diff().iloc[1:]
+    matrix = returns.corr(min_periods=MIN_BARS)
+
+    r = returns.drop(columns=BENCHMARK).to_numpy()
+    b = returns[BENCHMARK].to_numpy()[:, None]
+    # Pairwise-complete rows per ticker: both the stock and the index have a return
+    mask = ~np.isnan(r) & ~np.isnan(b)
+    n = mask.sum(axis=0)
+    r0, b0 = np.where(mask, r, 0.0), np.where(mask, b, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_mean, b_mean = r0.sum(axis=0) / n, b0.sum(axis=0) / n
+        cov = (np.where(mask, (r - r_mean) * (b - b_mean), 0.0)).sum(axis=0) / n
+        var = (np.where(mask, (b - b_mean) ** 2, 0.0)).sum(axis=0) / n
+        beta = np.where((n >= MIN_BARS) & (var > 0), cov / var, np.nan)
+    # Outperformance vs the index over the same bars, in percent
+    relative = np.where(n >= MIN_BARS, (np.exp(r0.sum(axis=0) - b0.sum(axis=0)) - 1) * 100, np.nan)
+
+    tickers = [c for c in closes.columns if c != BENCHMARK]
+    stats = pd.DataFrame({
+        'Correlation': matrix[BENCHMARK].reindex(tickers).to_numpy(),
+        'Beta': beta,
+        'Relative Strength': relative,
+    }, index=tickers).round(2)
+    return matrix.loc[tickers, tickers].round(2), stats
+
+def compute_correlation(frames, benchmark, version):
+    """Cached by version: a snapshot's matrix is built once however many sessions ask for it"""
+    cached = get_correlation(version)
+    if cached is not None:
+        return cached
+
+    closes = align_closes(frames, benchmark)
+    if closes.empty or len(closes) <= MIN_BARS:
+        result = CorrelationResult(pd.DataFrame(), pd.DataFrame(columns=['Correlation', 'Beta', 'Relative Strength']), version)
+    else:
+        matrix, stats = compute_stats(closes)
+        result = CorrelationResult(matrix, stats, version)
+        logging.info(f"Correlation matrix: {len(stats)} tickers x {len(closes)} bars")
+
+    with _RESULTS_LOCK:
+        _RESULTS[version] = result
+        while len(_RESULTS) > CACHE_VERSIONS:
+            _RESULTS.popitem(last=False)
+    return result
+
+def get_correlation(version):
+    """Cached result for a snapshot version, or None if it was never computed in this process"""
+    with _RESULTS_LOCK:
+        return _RESULTS.get(version)
+
+def attach_correlation(df, frames, benchmark, version):
+    """Fills the snapshot's 'Correlation with Nifty' column from the universe-wide result"""
+    result = compute_correlation(frames, benchmark, version)
+    if not df.empty and 'Ticker' in df.columns:
+        df['Correlation with Nifty'] = df['Ticker'].map(result.stats['Correlation']).fillna(0.0).astype(float)
+    return result
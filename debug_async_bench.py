@@ -0,0 +1,122 @@
+"""
+Offline benchmark for the asyncio fetch engine.
+Starts a local stub that mimics the NSE + Yahoo endpoints (with artificial latency)
+and times one full refresh against it. No internet access needed.
+
+    python debug_async_bench.py --tickers 200 --latency 150 --concurrency 32
+    python debug_async_bench.py --tickers 200 --rate 10 --burst 20   # under a token-bucket budget
+"""
+import argparse
+import asyncio
+import logging
+import time
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+import rate_limiter
+from async_fetcher import fetch_nse_data_async
+
+def make_chart(symbol, days=5):
+    rng = np.random.default_rng(abs(hash(symbol)) % (2 ** 32))
+    stamps = []
+    for day in pd.bdate_range(end=pd.Timestamp.now(tz='Asia/Kolkata').normalize(), periods=days):
+        stamps += list(pd.date_range(day + pd.Timedelta('9h15min'), day + pd.Timedelta('15h25min'), freq='5min'))
+    close = 100 + np.cumsum(rng.normal(0, 0.3, len(stamps)))
+    open_ = np.r_[close[0], close[:-1]]
+    return {'chart': {'result': [{
+        'timestamp': [int(ts.timestamp()) for ts in stamps],
+        'indicators': {'quote': [{
+            'open': open_.round(2).tolist(),
+            'high': (np.maximum(open_, close) + 0.1).round(2).tolist(),
+            'low': (np.minimum(open_, close) - 0.1).round(2).tolist(),
+            'close': close.round(2).tolist(),
+            'volume': rng.integers(1000, 50000, len(stamps)).tolist(),
+        }]}
+    }]}}
+
+def make_stub(tickers, latency, index_share):
+    stats = {'requests': 0, 'in_flight': 0, 'peak': 0}
+    in_index = tickers[:int(len(tickers) * index_share)]
+
+    async def delayed(handler_body):
+        stats['requests'] += 1
+        stats['in_flight'] += 1
+        stats['peak'] = max(stats['peak'], stats['in_flight'])
+        try:
+            await asyncio.sleep(latency)
+            return handler_body()
+        finally:
+            stats['in_flight'] -= 1
+
+    async def home(request):
+        def body():
+            resp = web.Response(text="ok")
+            resp.set_cookie("nsit", "stub")
+            return resp
+        return await delayed(body)
+
+    async def index(request):
+        def body():
+            rows = [{'symbol': t, 'priority': 0, 'lastPrice': 101.0, 'open': 100.0, 'change': 1.0,
+                     'pChange': 1.0, 'totalTradedVolume': 10000, 'meta': {'companyName': f"{t} Limited"}}
+                    for t in in_index]
+            return web.json_response({'data': rows})
+        return await delayed(body)
+
+    async def quote_equity(request):
+        if 'nsit' not in request.cookies:
+            return web.Response(status=401)
+        def body():
+            return web.json_response({'info': {'companyName': f"{request.query['symbol']} Limited"},
+                                      'priceInfo': {'lastPrice': 99.0, 'open': 100.0, 'change': -1.0, 'pChange': -1.0}})
+        return await delayed(body)
+
+    async def chart(request):
+        return await delayed(lambda: web.json_response(make_chart(request.match_info['symbol'])))
+
+    app = web.Application()
+    app.router.add_get('/', home)
+    app.router.add_get('/api/equity-stockIndices', index)
+    app.router.add_get('/api/quote-equity', quote_equity)
+    app.router.add_get('/v8/finance/chart/{symbol}', chart)
+    return app, stats
+
+async def run(args):
+    tickers = [f"STUB{i:03d}" for i in range(args.tickers)]
+    if args.rate > 0:
+        # Bench a specific upstream budget; by default the stub is unthrottled
+        rate_limiter.configure({host: {'rate': args.rate, 'burst': args.burst} for host in ('nse', 'yahoo')})
+    else:
+        rate_limiter.configure({host: {'rate': 1e9, 'burst': 1e9} for host in ('nse', 'yahoo')})
+    app, stats = make_stub(tickers, args.latency / 1000, args.index_share)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    try:
+        start = time.perf_counter()
+        df, is_bearish = await fetch_nse_data_async(
+            tickers, "bench", nse_base=base, yahoo_base=base, concurrency=args.concurrency
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    print(f"Tickers: {len(df)}/{len(tickers)} | Bearish: {is_bearish}")
+    print(f"Requests: {stats['requests']} | Peak in-flight: {stats['peak']} | Wall: {elapsed:.2f}s")
+    print(f"Rate limiter: {rate_limiter.format_stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=150, help="stub latency per request (ms)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=0, help="token-bucket rate per host (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--index-share", type=float, default=0.9, help="share of tickers present in the bulk payload")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s', force=True)
+    asyncio.run(run(parser.parse_args()))
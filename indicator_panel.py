@@ -0,0 +1,239 @@
+import logging
+import warnings
+import numpy as np
+import pandas as pd
+
+from nse_fetcher import to_ist, make_row, session_keys
+
+# --- Panel-wide Indicator Engine ---
+# Stacks every ticker's aligned bars into (time x ticker) NumPy panels and computes
+# RSI, VWAP, ATR/Supertrend and support/resistance for the whole universe at once.
+# Rows come out with the same columns as nse_fetcher.build_ticker_row. Everything is recomputed from
+# the fetched window on each refresh; the per_ticker engine's incremental state is not used here.
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def build_panel(frames):
+    """
+    {ticker: OHLCV frame} -> (index, tickers, {field: T x N array}, valid T x N mask).
+    Bars are aligned on the union clock. A ticker missing a bar gets a flat no-trade bar
+    (O=H=L=C=previous close, volume 0); bars before its first print stay NaN.
+    """
+    tickers = list(frames)
+    if not tickers:
+        return pd.DatetimeIndex([]), tickers, {f: np.empty((0, 0)) for f in FIELDS}, np.empty((0, 0), dtype=bool)
+
+    index = frames[tickers[0]].index
+    for ticker in tickers[1:]:
+        index = index.union(frames[ticker].index)
+
+    # (time x ticker x field) block, filled one ticker at a time from its own numpy values
+    block = np.full((len(index), len(tickers), len(FIELDS)), np.nan)
+    for j, ticker in enumerate(tickers):
+        block[:, j, :] = frames[ticker].reindex(index, columns=FIELDS).to_numpy(dtype='float64')
+
+    raw = {field: block[:, :, k] for k, field in enumerate(FIELDS)}
+    valid = ~np.isnan(raw['Close'])
+
+    filled_close = pd.DataFrame(raw['Close']).ffill().to_numpy()
+    panel = {'Close': filled_close}
+    for field in ['Open', 'High', 'Low']:
+        panel[field] = np.where(np.isnan(raw[field]), filled_close, raw[field])
+    panel['Volume'] = np.where(valid, np.nan_to_num(raw['Volume']), 0.0)
+    return index, tickers, panel, valid
+
+def align_last(values, valid):
+    """
+    T x N panel -> T x N array of each ticker's own bars only, packed at the bottom (row -1 = its
+    last real bar, row -k = its k-th last), NaN above. Indicators that count bars then see the
+    same series as the per-ticker engine instead of the union clock's inserted flat bars.
+    """
+    n_bars = values.shape[0]
+    dest = np.cumsum(valid, axis=0) - 1 + (n_bars - valid.sum(axis=0))[None, :]
+    rows, cols = np.nonzero(valid)
+    packed = np.full(values.shape, np.nan)
+    packed[dest[rows, cols], cols] = values[rows, cols]
+    return packed
+
+def panel_rsi(close, period=14):
+    """Last-bar RSI per ticker, calculate_rsi's rolling-mean definition (pass align_last closes)"""
+    delta = np.diff(close, axis=0, prepend=np.nan)
+    # Like calculate_rsi: the undefined first delta counts as a zero gain/loss
+    gains = np.where(delta > 0, delta, 0.0)[-period:]
+    losses = np.where(delta < 0, -delta, 0.0)[-period:]
+    avg_gain = gains.mean(axis=0)
+    avg_loss = losses.mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss > 0, 100 - 100 / (1 + avg_gain / avg_loss), 100.0)
+    return np.round(rsi, 2)
+
+def panel_vwap(index, close, volume, valid):
+    """
+    Session-anchored VWAP and its volume-weighted stdev per ticker -> (vwap, stdev) arrays.
+    Each ticker uses the bars of its own latest session, like session_vwap on its frame.
+    """
+    codes = pd.factorize(session_keys(index))[0]
+    # Row of each ticker's last real bar -> that ticker's latest session
+    last_row = len(index) - 1 - np.argmax(valid[::-1], axis=0)
+    in_session = (codes[:, None] == codes[last_row][None, :]) & valid
+
+    v = np.where(in_session, volume, 0.0)
+    p = np.where(in_session, close, 0.0)
+    vol = v.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = np.where(vol > 0, (p * v).sum(axis=0) / vol, 0.0)
+        variance = np.where(vol > 0, (p * p * v).sum(axis=0) / vol - vwap * vwap, 0.0)
+    return vwap, np.sqrt(np.maximum(variance, 0.0))
+
+def panel_atr(high, low, close, period=7):
+    prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    tr = np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    # Column-wise ewm starts at each ticker's first bar, like the per-ticker Series.ewm
+    return pd.DataFrame(tr).ewm(alpha=1/period, adjust=False).mean().to_numpy()
+
+def panel_supertrend(high, low, close, period=7, multiplier=3):
+    """
+    Supertrend trend state for every ticker -> T x N bool array (True = uptrend).
+    The band recursion steps through time once, with each step vectorized across tickers.
+    Pass align_last arrays so every ticker steps through its own bars only.
+    """
+    atr = panel_atr(high, low, close, period)
+    hl2 = (high + low) / 2
+    basic_upper = hl2 + multiplier * atr
+    basic_lower = hl2 - multiplier * atr
+
+    n_bars, n_tickers = close.shape
+    uptrend = np.ones((n_bars, n_tickers), dtype=bool)
+    if n_bars == 0: return uptrend
+
+    final_upper, final_lower = basic_upper[0].copy(), basic_lower[0].copy()
+    trend = np.ones(n_tickers, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        for i in range(1, n_bars):
+            prev_close = close[i-1]
+            new_upper = np.where((basic_upper[i] < final_upper) | (prev_close > final_upper), basic_upper[i], final_upper)
+            new_lower = np.where((basic_lower[i] > final_lower) | (prev_close < final_lower), basic_lower[i], final_lower)
+            new_trend = np.where(trend, ~(close[i] < new_lower), close[i] > new_upper)
+
+            # Tickers whose first bar is this one start fresh (first band = basic band, uptrend)
+            starting = np.isnan(final_upper)
+            final_upper = np.where(starting, basic_upper[i], new_upper)
+            final_lower = np.where(starting, basic_lower[i], new_lower)
+            trend = np.where(starting, True, new_trend)
+            uptrend[i] = trend
+    return uptrend
+
+def panel_levels(high, low):
+    """Window high/low per ticker (calculate_levels on the 15m frame covers the same bars)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.round(np.nanmin(low, axis=0), 2), np.round(np.nanmax(high, axis=0), 2)
+
+def panel_scanners(index, high, low, close, volume, valid, roc_bars=12, atr_period=14):
+    """
+    Scanner metrics at each ticker's last bar -> {column: array}:
+    Momentum % (rate of change over roc_bars), ATR % of price, Range Expansion (latest session's
+    range vs the average of earlier sessions) and Volume Surge (latest session's volume so far vs
+    earlier sessions' volume up to the same time of day).
+    """
+    n_bars = len(index)
+    bar_counts = valid.sum(axis=0)
+    # Rate of change and ATR count bars: each ticker's own bars, not the union clock
+    own_high, own_low, own_close = (align_last(a, valid) for a in (high, low, close))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        momentum = np.full(close.shape[1], np.nan)
+        if n_bars > roc_bars:
+            momentum = np.where(bar_counts > roc_bars, (own_close[-1] / own_close[-1 - roc_bars] - 1) * 100, np.nan)
+        atr_pct = np.where(bar_counts >= atr_period,
+                           panel_atr(own_high, own_low, own_close, atr_period)[-1] / own_close[-1] * 100, np.nan)
+
+        # Per-session high/low/volume (S x N), NaN for sessions a ticker didn't trade
+        codes = pd.factorize(session_keys(index))[0]
+        last_row = n_bars - 1 - np.argmax(valid[::-1], axis=0)
+        last_code = codes[last_row]
+        grouped_high = pd.DataFrame(np.where(valid, high, np.nan)).groupby(codes).max().to_numpy()
+        grouped_low = pd.DataFrame(np.where(valid, low, np.nan)).groupby(codes).min().to_numpy()
+        session_range = grouped_high - grouped_low
+        columns = np.arange(close.shape[1])
+        earlier = np.arange(len(session_range))[:, None] < last_code[None, :]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            avg_range = np.nanmean(np.where(earlier, session_range, np.nan), axis=0)
+        range_expansion = session_range[last_code, columns] / avg_range
+
+        # Time-of-day matched volume: earlier sessions only count bars up to the latest bar's time
+        time_of_day = np.asarray(index - index.normalize())
+        same_window = (codes[:, None] < last_code[None, :]) & (time_of_day[:, None] <= time_of_day[last_row][None, :]) & valid
+        today = (codes[:, None] == last_code[None, :]) & valid
+        prior_sessions = pd.DataFrame(same_window).groupby(codes).any().to_numpy().sum(axis=0)
+        prior_volume = np.where(same_window, volume, 0.0).sum(axis=0) / prior_sessions
+        volume_surge = np.where(prior_volume > 0, np.where(today, volume, 0.0).sum(axis=0) / prior_volume, np.nan)
+
+    return {
+        'Momentum %': np.round(momentum, 2),
+        'ATR %': np.round(atr_pct, 2),
+        'Range Expansion': np.round(range_expansion, 2),
+        'Volume Surge': np.round(volume_surge, 2),
+    }
+
+def scanner_frame(frames):
+    """{ticker: 5m frame} -> ticker-indexed frame of panel_scanners columns"""
+    intraday = {t: to_ist(f.copy()) for t, f in frames.items() if not f.empty}
+    index, tickers, panel, valid = build_panel(intraday)
+    if not tickers:
+        return pd.DataFrame()
+    metrics = panel_scanners(index, panel['High'], panel['Low'], panel['Close'], panel['Volume'], valid)
+    return pd.DataFrame(metrics, index=tickers)
+
+def compute_panel_rows(inputs, timestamp):
+    """{ticker: (quote, bars)} -> list of snapshot rows, indicators computed universe-wide"""
+    tickers = list(inputs)
+    intraday = {}
+    for ticker in tickers:
+        frame = inputs[ticker][1].get('5m', pd.DataFrame())
+        if not frame.empty:
+            intraday[ticker] = to_ist(frame.copy())
+
+    index, panel_tickers, panel, valid = build_panel(intraday)
+    column = {t: j for j, t in enumerate(panel_tickers)}
+    bar_counts = valid.sum(axis=0)
+
+    if panel_tickers:
+        # RSI / Supertrend count bars: run them on each ticker's own bars, not the union clock
+        own = {field: align_last(panel[field], valid) for field in ['High', 'Low', 'Close']}
+        rsi = panel_rsi(own['Close'])
+        vwap, vwap_stdev = panel_vwap(index, panel['Close'], panel['Volume'], valid)
+        uptrend = panel_supertrend(own['High'], own['Low'], own['Close'])[-1]
+        support, resistance = panel_levels(panel['High'], panel['Low'])
+
+        # Volume fallback: today's summed 5m volume where the live quote had none
+        today = pd.Timestamp.now(tz='Asia/Kolkata').normalize()
+        today_mask = np.asarray(index.normalize() == today)
+        today_volume = panel['Volume'][today_mask].sum(axis=0)
+
+    rows = []
+    for ticker in tickers:
+        quote = inputs[ticker][0]
+        volume = quote['volume']
+        # Correlation is filled in afterwards from the universe-wide matrix (correlation.py)
+        rsi_val, vwap_val, vwap_stdev_val, correlation = 0.0, 0.0, 0.0, 0.0
+        supertrend, trend_signal = "Neutral", "Neutral"
+        support_val, resistance_val = 0.0, 0.0
+
+        j = column.get(ticker)
+        if j is not None:
+            if volume == 0 and today_volume[j] > 0:
+                volume = int(today_volume[j])
+            rsi_val = float(rsi[j]) if bar_counts[j] >= 14 else 0.0
+            vwap_val, vwap_stdev_val = round(float(vwap[j]), 2), float(vwap_stdev[j])
+            supertrend = ("Bullish" if uptrend[j] else "Bearish") if bar_counts[j] >= 7 else "Neutral"
+            trend_signal = "Bullish" if quote['price'] > vwap_val else "Bearish"
+            # Same window as the 15m frame calculate_levels runs on
+            support_val, resistance_val = float(support[j]), float(resistance[j])
+
+        rows.append(make_row(ticker, timestamp, quote, volume, rsi_val, vwap_val, supertrend,
+                             support_val, resistance_val, trend_signal, correlation, vwap_stdev_val))
+
+    logging.info(f"Panel engine: {len(panel_tickers)} tickers x {len(index)} bars")
+    return rows
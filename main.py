@@ -1,10 +1,19 @@
 import logging
-from datetime import datetime
+import argparse
+import signal
+import threading
+import math
+from datetime import datetime, timedelta
 import time
 # Import the absolute path from config
 from config import TICKERS, EXCEL_FILE, LOG_FILE 
-from nse_fetcher import fetch_nse_data
+from nse_fetcher import fetch_nse_data, export_frame, SCANNER_COLUMNS, VWAP_BAND_COLUMNS
 from excel_writer import write_to_excel
+from pivots import PIVOT_COLUMNS
+from market_hours import (
+    now_ist, is_trading_time, frequency_seconds,
+    session_start_dt, session_end_dt, next_session_start, last_session_day
+)
 
 # Setup logging using the ABSOLUTE path
 logging.basicConfig(
@@ -38,8 +47,10 @@ def main():
 
         logging.info(f"Writing {len(data)} records to Excel...")
         
-        # Write to Excel (Passing Trend)
-        write_to_excel(data, EXCEL_FILE, is_bearish)
+        # Write to Excel (Passing Trend); the sheet is filled by position from column A, so the app-only
+        # VWAP band, pivot and scanner columns are dropped to keep the layout
+        app_only = VWAP_BAND_COLUMNS + PIVOT_COLUMNS + SCANNER_COLUMNS
+        write_to_excel(export_frame(data.drop(columns=app_only, errors='ignore')), EXCEL_FILE, is_bearish)
         
         logging.info(f"Successfully saved {len(data)} stock records")
         
@@ -47,5 +58,65 @@ def main():
         logging.error(f"Critical error in main cycle: {str(e)}")
         print(f"Error: {e}")
 
+# --- Scheduler Mode (one warm process instead of an external cron) ---
+
+def next_tick(now, interval):
+    """Next tick on the session grid (09:15 + k*interval), so ticks never drift with run time"""
+    start = session_start_dt(now.date())
+    elapsed = (now - start).total_seconds()
+    return start + timedelta(seconds=(math.floor(elapsed / interval) + 1) * interval)
+
+def run_scheduler(interval=None):
+    interval = interval or frequency_seconds()
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logging.info(f"Received {signal.Signals(signum).name}; stopping after the current cycle")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    logging.info(f"Scheduler started: every {interval}s inside trading hours, EOD fetch after close")
+    eod_done_for = None
+
+    while not stop_event.is_set():
+        now = now_ist()
+
+        if is_trading_time(now):
+            # Runs are inline, so a slow cycle can never overlap the next one; missed ticks are skipped
+            main()
+            finished = now_ist()
+            missed = int((finished - now).total_seconds() // interval)
+            if missed:
+                logging.warning(f"Cycle took longer than the interval; skipping {missed} tick(s)")
+            wake_at = next_tick(finished, interval)
+            # Past the close the EOD branch below takes over
+            wake_at = min(wake_at, session_end_dt(finished.date()) + timedelta(seconds=1))
+
+        elif eod_done_for != last_session_day(now):
+            # Outside the session: one end-of-day fetch for the last closed session, then idle
+            logging.info(f"Session closed; running end-of-day fetch for {last_session_day(now)}")
+            main()
+            eod_done_for = last_session_day(now)
+            wake_at = next_session_start(now_ist())
+
+        else:
+            wake_at = next_session_start(now)
+
+        wait = max(0.0, (wake_at - now_ist()).total_seconds())
+        logging.info(f"Next run at {wake_at.strftime('%Y-%m-%d %H:%M:%S')} IST")
+        stop_event.wait(wait)
+
+    logging.info("Scheduler stopped")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fetch NSE data and write it to Excel")
+    parser.add_argument("--schedule", action="store_true", help="run continuously, driven by TRADING_HOURS and the holiday calendar")
+    parser.add_argument("--interval", type=int, default=None, help="seconds between intraday runs (default: TRADING_HOURS['frequency'])")
+    args = parser.parse_args()
+
+    if args.schedule:
+        run_scheduler(args.interval)
+    else:
+        main()
@@ -0,0 +1,118 @@
+import os
+import logging
+import threading
+from datetime import datetime, timedelta, time as dtime
+import pytz
+from config import TRADING_HOURS, HOLIDAY_FILE
+
+# --- IST Trading Session Helpers (driven by config.TRADING_HOURS) ---
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# TRADING_HOURS['frequency'] may be a named cadence or a number of seconds
+FREQUENCY_SECONDS = {
+    'hourly': 3600,
+    'half-hourly': 1800,
+    '15min': 900,
+    '5min': 300,
+    '1min': 60,
+}
+
+def now_ist():
+    return datetime.now(IST)
+
+def parse_hhmm(value):
+    hours, minutes = value.split(':')
+    return dtime(int(hours), int(minutes))
+
+def session_bounds():
+    return parse_hhmm(TRADING_HOURS['start']), parse_hhmm(TRADING_HOURS['end'])
+
+def frequency_seconds(frequency=None):
+    frequency = TRADING_HOURS.get('frequency', 'hourly') if frequency is None else frequency
+    if isinstance(frequency, (int, float)):
+        return int(frequency)
+    return FREQUENCY_SECONDS.get(str(frequency).lower(), 3600)
+
+_HOLIDAYS = None
+_HOLIDAYS_LOADED_ON = None
+_HOLIDAYS_LOCK = threading.Lock()
+
+def load_holidays(path=HOLIDAY_FILE):
+    """Local NSE holiday calendar: one YYYY-MM-DD per line, '#' starts a comment"""
+    holidays = set()
+    if not os.path.exists(path):
+        logging.warning(f"Holiday calendar not found at {path}; treating every weekday as a session")
+        return holidays
+    with open(path) as f:
+        for line in f:
+            entry = line.split('#', 1)[0].strip()
+            if not entry: continue
+            try: holidays.add(datetime.strptime(entry, "%Y-%m-%d").date())
+            except ValueError: logging.warning(f"Ignoring bad holiday entry: {entry}")
+    return holidays
+
+def fetch_exchange_holidays():
+    """Cash-segment trading holidays from NSE's holiday-master API (current year); empty set on failure"""
+    try:
+        # Imported lazily: the scheduler helpers stay usable without the NSE client
+        from nsepython import nse_holidays
+        from rate_limiter import throttle
+        throttle('nse')
+        payload = nse_holidays("trading")
+        return {datetime.strptime(entry['tradingDate'], "%d-%b-%Y").date() for entry in payload.get('CM', [])}
+    except Exception as e:
+        logging.warning(f"NSE holiday calendar unavailable ({e}); using {HOLIDAY_FILE} only")
+        return set()
+
+def get_holidays():
+    """Exchange calendar merged with the local file, loaded once per day (new circulars, year rollover)"""
+    global _HOLIDAYS, _HOLIDAYS_LOADED_ON
+    today = now_ist().date()
+    with _HOLIDAYS_LOCK:
+        if _HOLIDAYS_LOADED_ON != today:
+            _HOLIDAYS = load_holidays() | fetch_exchange_holidays()
+            _HOLIDAYS_LOADED_ON = today
+        return _HOLIDAYS
+
+def is_trading_day(day):
+    """Mon-Fri, excluding exchange holidays"""
+    return day.weekday() < 5 and day not in get_holidays()
+
+def session_start_dt(day):
+    return IST.localize(datetime.combine(day, session_bounds()[0]))
+
+def session_end_dt(day):
+    return IST.localize(datetime.combine(day, session_bounds()[1]))
+
+def next_session_start(now=None):
+    """Start of the next session that has not begun yet"""
+    now = (now or now_ist()).astimezone(IST)
+    day = now.date()
+    if is_trading_day(day) and now < session_start_dt(day):
+        return session_start_dt(day)
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return session_start_dt(day)
+
+def last_session_day(now=None):
+    """Most recent trading day whose session has already closed"""
+    now = (now or now_ist()).astimezone(IST)
+    day = now.date()
+    if not (is_trading_day(day) and now > session_end_dt(day)):
+        day -= timedelta(days=1)
+        while not is_trading_day(day):
+            day -= timedelta(days=1)
+    return day
+
+def is_trading_time(now=None):
+    """True while the IST cash session is open"""
+    now = now or now_ist()
+    if now.tzinfo is None:
+        now = IST.localize(now)
+    now = now.astimezone(IST)
+    if not is_trading_day(now.date()):
+        return False
+    start, end = session_bounds()
+    return start <= now.time() <= end
@@ -0,0 +1,89 @@
+import threading
+import logging
+import time
+from collections import namedtuple
+from config import SNAPSHOT_TTL_SECONDS
+from market_hours import is_trading_time
+from cache_policy import market_ttl
+from nse_fetcher import fetch_market_snapshot
+from single_flight import market_flight
+
+# --- Background Market Refresher ---
+# One daemon thread per server process keeps the latest snapshot warm during trading hours.
+# It is the only scheduled fetcher: it ticks on the same market_ttl grid as the app's snapshot
+# cache (09:15, 09:17, ... for a 120s interval) and sleeps through to the next open outside the
+# session. Pages read `get_snapshot()` and never block on upstream I/O once the first fetch has landed.
+
+Snapshot = namedtuple('Snapshot', ['df', 'is_bearish', 'timestamp', 'version'])
+
+class MarketRefresher(threading.Thread):
+    def __init__(self, tickers, interval=SNAPSHOT_TTL_SECONDS):
+        super().__init__(name="market-refresher", daemon=True)
+        self.tickers = tickers
+        self.interval = interval
+        self.snapshot = None
+        self.last_error = None
+        self.swap_lock = threading.Lock()
+        self.swapped = threading.Condition(self.swap_lock)
+        self.stop_event = threading.Event()
+
+    def get_snapshot(self):
+        # Plain attribute read: the snapshot is swapped as one reference, never mutated in place
+        return self.snapshot
+
+    def refresh(self, scope="all"):
+        """
+        Fetch now (shared with any in-flight app fetch of the same scope) and swap the snapshot in atomically.
+        scope='quotes' / 'bars' refetches only that input on top of the last refresh.
+        """
+        key = "market_snapshot" if scope == "all" else f"market_snapshot:{scope}"
+        try:
+            df, is_bearish, timestamp, version = market_flight.do(key, fetch_market_snapshot, self.tickers, scope)
+        except Exception as e:
+            self.last_error = e
+            logging.error(f"Background refresh failed: {e}")
+            return self.snapshot
+
+        if df.empty:
+            logging.warning("Background refresh returned no data; keeping previous snapshot")
+            return self.snapshot
+
+        with self.swap_lock:
+            # Ids are taken when a fetch starts: one that started earlier but finished later is older data
+            if self.snapshot is not None and self.snapshot.version >= version:
+                logging.info(f"Snapshot v{version} superseded by v{self.snapshot.version}; not swapped in")
+                return self.snapshot
+            self.snapshot = Snapshot(df, is_bearish, timestamp, version)
+            self.swapped.notify_all()
+        logging.info(f"Snapshot v{version} swapped in ({len(df)} rows @ {timestamp})")
+        return self.snapshot
+
+    def wait_for_newer(self, version, timeout):
+        """Blocks until a snapshot newer than `version` is swapped in (or timeout) -> latest snapshot"""
+        with self.swapped:
+            self.swapped.wait_for(lambda: self.snapshot is not None and self.snapshot.version > version, timeout)
+            return self.snapshot
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        # Warm once at start-up so the first visitor never waits for a full scan
+        self.refresh()
+
+        # Grid-aligned ticks: every `interval` from the session open, nothing outside the session
+        while not self.stop_event.wait(timeout=market_ttl(self.interval)):
+            if is_trading_time():
+                self.refresh()
+
+_REFRESHER = None
+_REFRESHER_LOCK = threading.Lock()
+
+def start_market_refresher(tickers, interval=SNAPSHOT_TTL_SECONDS):
+    """Starts the refresher once per server process; later calls return the running instance"""
+    global _REFRESHER
+    with _REFRESHER_LOCK:
+        if _REFRESHER is None or not _REFRESHER.is_alive():
+            _REFRESHER = MarketRefresher(tickers, interval)
+            _REFRESHER.start()
+        return _REFRESHER
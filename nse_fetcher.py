@@ -5,12 +5,24 @@ import logging
 import time
 import numpy as np
 import re
+import json
+import random
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import matplotlib.lines as lines
 import os
 import concurrent.futures
-from config import CHART_PATH
+import threading
+import copy
+import itertools
+from collections import deque, namedtuple, OrderedDict
+from datetime import datetime
+from config import (CHART_PATH, FETCH_ENGINE, USE_BAR_STORE, PER_TICKER_INCREMENTAL_STATE, INDICATOR_ENGINE,
+                    TRADING_HOURS, VWAP_BAND_STDEV, SCANNER_TOP_N, fetch_index_payload)
+from bar_store import get_bar_store
+from rate_limiter import throttle, get_bucket, format_stats
+from correlation import attach_correlation
+from pivots import attach_pivots
 
 # --- Helper Functions ---
 
@@ -35,70 +47,104 @@ def calculate_rsi(series, period=14):
     rsi = 100 - (100 / (1 + rs)).fillna(0)
     return round(float(rsi.iloc[-1]), 2)
 
-def calculate_vwap(df):
+_open_h, _open_m = map(int, TRADING_HOURS['start'].split(':'))
+SESSION_ANCHOR = pd.Timedelta(hours=_open_h, minutes=_open_m)
+
+def session_keys(index):
+    """Session date per bar, with the day rolling over at the market open (09:15 IST)"""
+    return (index - SESSION_ANCHOR).normalize()
+
+def session_vwap(df):
+    """(vwap, stdev) over the latest session's bars; stdev is the volume-weighted spread around the VWAP"""
     try:
-        v = df['Volume']
-        p = df['Close']
-        vwap = (p * v).cumsum() / v.cumsum()
-        return round(float(vwap.iloc[-1]), 2)
+        session = df[session_keys(df.index) == session_keys(df.index[-1:])[0]]
+        v = session['Volume'].fillna(0)
+        p = session['Close']
+        volume = float(v.sum())
+        if volume == 0: return 0.0, 0.0
+        vwap = float((p * v).sum()) / volume
+        variance = float((p * p * v).sum()) / volume - vwap * vwap
+        return vwap, float(np.sqrt(max(variance, 0.0)))
     except:
-        return 0.0
+        return 0.0, 0.0
 
-def calculate_supertrend(df, period=7, multiplier=3):
-    try:
-        if len(df) < period:
-            return "Neutral"
+def calculate_vwap(df):
+    return round(session_vwap(df)[0], 2)
 
-        hl2 = (df['High'] + df['Low']) / 2
+# Optional band columns, inserted after VWAP when VWAP_BAND_STDEV is set
+VWAP_BAND_COLUMNS = ['VWAP Upper', 'VWAP Lower']
 
-        df['tr0'] = abs(df['High'] - df['Low'])
-        df['tr1'] = abs(df['High'] - df['Close'].shift(1))
-        df['tr2'] = abs(df['Low'] - df['Close'].shift(1))
-        df['tr'] = df[['tr0', 'tr1', 'tr2']].max(axis=1)
+def vwap_bands(vwap, stdev, multiplier=VWAP_BAND_STDEV):
+    """(upper, lower) VWAP bands, or None when bands are disabled"""
+    if not multiplier: return None
+    return round(vwap + multiplier * stdev, 2), round(vwap - multiplier * stdev, 2)
 
-        df['atr'] = df['tr'].ewm(alpha=1/period, adjust=False).mean()
+def supertrend_kernel(high, low, close, period=7, multiplier=3):
+    """
+    Supertrend over plain NumPy arrays -> (uptrend, final_upper, final_lower) arrays.
+    TR/ATR/basic bands are vectorized; only the path-dependent final-band recursion
+    loops, over Python floats rather than DataFrame cells.
+    """
+    high = np.asarray(high, dtype='float64')
+    low = np.asarray(low, dtype='float64')
+    close = np.asarray(close, dtype='float64')
+    n = len(close)
 
-        df['upperband'] = hl2 + multiplier * df['atr']
-        df['lowerband'] = hl2 - multiplier * df['atr']
+    prev_close = np.empty(n)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    # fmax skips the NaN previous close on the first bar, like max(axis=1) did
+    tr = np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = pd.Series(tr).ewm(alpha=1/period, adjust=False).mean().to_numpy()
 
-        df['final_upper'] = df['upperband']
-        df['final_lower'] = df['lowerband']
-        df['uptrend'] = True
+    hl2 = (high + low) / 2
+    basic_upper = (hl2 + multiplier * atr).tolist()
+    basic_lower = (hl2 - multiplier * atr).tolist()
+    closes = close.tolist()
 
-        for i in range(1, len(df)):
-            curr_basic_upper = df['upperband'].iloc[i]
-            curr_basic_lower = df['lowerband'].iloc[i]
-            prev_final_upper = df['final_upper'].iloc[i-1]
-            prev_final_lower = df['final_lower'].iloc[i-1]
-            prev_close = df['Close'].iloc[i-1]
-            curr_close = df['Close'].iloc[i]
-            prev_trend = df['uptrend'].iloc[i-1]
+    final_upper = [0.0] * n
+    final_lower = [0.0] * n
+    uptrend = [True] * n
+    if n == 0:
+        return np.array(uptrend, dtype=bool), np.array(final_upper), np.array(final_lower)
 
-            # Final Upper Band
-            if curr_basic_upper < prev_final_upper or prev_close > prev_final_upper:
-                df.loc[df.index[i], 'final_upper'] = curr_basic_upper
-            else:
-                df.loc[df.index[i], 'final_upper'] = prev_final_upper
+    final_upper[0], final_lower[0] = basic_upper[0], basic_lower[0]
+    for i in range(1, n):
+        prev_upper, prev_lower, prev_close_i = final_upper[i-1], final_lower[i-1], closes[i-1]
 
-            # Final Lower Band
-            if curr_basic_lower > prev_final_lower or prev_close < prev_final_lower:
-                df.loc[df.index[i], 'final_lower'] = curr_basic_lower
-            else:
-                df.loc[df.index[i], 'final_lower'] = prev_final_lower
+        # Final Upper Band
+        if basic_upper[i] < prev_upper or prev_close_i > prev_upper:
+            final_upper[i] = basic_upper[i]
+        else:
+            final_upper[i] = prev_upper
 
-            # Trend
-            if prev_trend:
-                if curr_close < df['final_lower'].iloc[i]:
-                    df.loc[df.index[i], 'uptrend'] = False
-                else:
-                    df.loc[df.index[i], 'uptrend'] = True
-            else:
-                if curr_close > df['final_upper'].iloc[i]:
-                    df.loc[df.index[i], 'uptrend'] = True
-                else:
-                    df.loc[df.index[i], 'uptrend'] = False
+        # Final Lower Band
+        if basic_lower[i] > prev_lower or prev_close_i < prev_lower:
+            final_lower[i] = basic_lower[i]
+        else:
+            final_lower[i] = prev_lower
 
-        return "Bullish" if df['uptrend'].iloc[-1] else "Bearish"
+        # Trend
+        if uptrend[i-1]:
+            uptrend[i] = not (closes[i] < final_lower[i])
+        else:
+            uptrend[i] = closes[i] > final_upper[i]
+
+    return np.array(uptrend, dtype=bool), np.array(final_upper), np.array(final_lower)
+
+def supertrend_series(df, period=7, multiplier=3):
+    """Full Bullish/Bearish trend series aligned to df (reusable for charts/backtests)"""
+    if len(df) < period:
+        return pd.Series("Neutral", index=df.index)
+    uptrend, _, _ = supertrend_kernel(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), period, multiplier)
+    return pd.Series(np.where(uptrend, "Bullish", "Bearish"), index=df.index)
+
+def calculate_supertrend(df, period=7, multiplier=3):
+    """Latest Supertrend state; the caller's frame is left untouched"""
+    try:
+        if len(df) < period:
+            return "Neutral"
+        return supertrend_series(df, period, multiplier).iloc[-1]
 
     except Exception as e:
         print("ST ERROR:", e)
@@ -127,6 +173,216 @@ def get_trend(change):
     if change < 0: return "Bearish"
     return "Neutral"
 
+# --- Indicator Registry ---
+# Every indicator declares the bar interval it reads and how many bars of it it needs (warm-up included;
+# intraday lookbacks count bars before today's session, which is always fetched on top). The download /
+# bar-store window is derived from this table, so adding an indicator is what grows the fetch and
+# removing one is what shrinks it.
+
+Indicator = namedtuple('Indicator', ['interval', 'lookback'])
+
+BARS_PER_SESSION = {'5m': 75, '15m': 25, '1d': 1}
+
+INDICATORS = {
+    'rsi': Indicator('5m', 14 + 1),
+    # Wilder ATR needs ~10 periods before the bands stop depending on the first bar
+    'supertrend': Indicator('5m', 7 * 10),
+    # Session-anchored: today's 5m bars only
+    'vwap': Indicator('5m', 0),
+    # Previous session's H/L/C plus today's
+    'pivots': Indicator('1d', 2),
+    # Range of the last four full sessions (plus today)
+    'levels': Indicator('15m', 4 * BARS_PER_SESSION['15m']),
+    'correlation': Indicator('15m', 4 * BARS_PER_SESSION['15m']),
+    # Scanners: one hour of 5m bars, Wilder ATR(14) warm-up, today's 5m bars vs the four sessions before
+    'momentum': Indicator('5m', 12 + 1),
+    'atr_pct': Indicator('5m', 14 * 10),
+    'range_expansion': Indicator('5m', 4 * BARS_PER_SESSION['5m']),
+    'volume_surge': Indicator('5m', 4 * BARS_PER_SESSION['5m']),
+}
+
+def lookback_sessions(indicator):
+    """Sessions of bars an indicator needs; intraday lookbacks get today's (maybe just-opened) session on top"""
+    per_session = BARS_PER_SESSION[indicator.interval]
+    sessions = -(-indicator.lookback // per_session)
+    return sessions + 1 if per_session > 1 else sessions
+
+def fetch_sessions(names=None):
+    """Minimal session window covering the given indicators (default: the whole registry)"""
+    selected = INDICATORS.values() if names is None else [INDICATORS[name] for name in names]
+    return max((lookback_sessions(indicator) for indicator in selected), default=1)
+
+FETCH_SESSIONS = fetch_sessions()
+FETCH_PERIOD = f"{FETCH_SESSIONS}d"
+
+# --- Incremental Indicator State ---
+# Running state per ticker so a refresh only folds in the bars that arrived since the last one.
+# RSI and VWAP match calculate_rsi / session_vwap on the same bars. Supertrend is an approximation
+# once the fetch window slides: its ATR keeps smoothing from the first bar this process saw, while
+# calculate_supertrend restarts the EWM at the window start. The gap decays by (1 - 1/period) per
+# bar, so it only matters for band touches right at the threshold.
+
+class RSIState:
+    """Rolling-mean RSI (calculate_rsi's definition) kept as the last `period` gains/losses"""
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.gains = deque(maxlen=period)
+        self.losses = deque(maxlen=period)
+
+    def update(self, close):
+        # The first bar has no delta; calculate_rsi counts it as a zero gain/loss
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.gains.append(delta if delta > 0 else 0.0)
+        self.losses.append(-delta if delta < 0 else 0.0)
+        self.prev_close = close
+        self.count += 1
+
+    def clone(self):
+        other = copy.copy(self)
+        other.gains, other.losses = deque(self.gains, maxlen=self.period), deque(self.losses, maxlen=self.period)
+        return other
+
+    def value(self):
+        if self.count < self.period: return 0.0
+        loss = sum(self.losses) / self.period
+        if loss == 0: return 100.0
+        rs = (sum(self.gains) / self.period) / loss
+        return round(100 - (100 / (1 + rs)), 2)
+
+class VWAPState:
+    """Session-anchored running sums (price x volume, price^2 x volume, volume); resets at each session open"""
+    def __init__(self):
+        self.session = None
+        self.pv = 0.0
+        self.p2v = 0.0
+        self.volume = 0.0
+
+    def update(self, ts, close, volume):
+        session = (ts - SESSION_ANCHOR).normalize()
+        if session != self.session:
+            self.session, self.pv, self.p2v, self.volume = session, 0.0, 0.0, 0.0
+        self.pv += close * volume
+        self.p2v += close * close * volume
+        self.volume += volume
+
+    def value(self):
+        """(vwap, stdev) for the current session"""
+        if self.volume == 0: return 0.0, 0.0
+        vwap = self.pv / self.volume
+        return vwap, float(np.sqrt(max(self.p2v / self.volume - vwap * vwap, 0.0)))
+
+class SupertrendState:
+    """Wilder ATR plus final bands and trend, advanced one bar at a time (same recursion as supertrend_kernel)"""
+    def __init__(self, period=7, multiplier=3):
+        self.period = period
+        self.multiplier = multiplier
+        self.count = 0
+        self.atr = None
+        self.prev_close = None
+        self.final_upper = None
+        self.final_lower = None
+        self.uptrend = True
+
+    def update(self, high, low, close):
+        tr = abs(high - low)
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.atr = tr if self.atr is None else self.atr + (tr - self.atr) / self.period
+
+        hl2 = (high + low) / 2
+        basic_upper = hl2 + self.multiplier * self.atr
+        basic_lower = hl2 - self.multiplier * self.atr
+
+        if self.final_upper is None:
+            self.final_upper, self.final_lower = basic_upper, basic_lower
+        else:
+            if not (basic_upper < self.final_upper or self.prev_close > self.final_upper):
+                basic_upper = self.final_upper
+            if not (basic_lower > self.final_lower or self.prev_close < self.final_lower):
+                basic_lower = self.final_lower
+            self.final_upper, self.final_lower = basic_upper, basic_lower
+
+            if self.uptrend:
+                self.uptrend = not (close < self.final_lower)
+            else:
+                self.uptrend = close > self.final_upper
+
+        self.prev_close = close
+        self.count += 1
+
+    def value(self):
+        if self.count < self.period: return "Neutral"
+        return "Bullish" if self.uptrend else "Bearish"
+
+class TickerIndicatorState:
+    """
+    All incremental indicators for one ticker.
+    Closed bars are committed once; the newest bar may still be forming, so it is only
+    applied to a throwaway copy when reading values.
+    """
+    def __init__(self):
+        self.rsi = RSIState(14)
+        self.vwap = VWAPState()
+        self.supertrend = SupertrendState(7, 3)
+        self.last_ts = None
+
+    def apply(self, ts, high, low, close, volume):
+        self.rsi.update(close)
+        self.vwap.update(ts, close, volume)
+        self.supertrend.update(high, low, close)
+
+    def commit(self, bars):
+        for ts, high, low, close, volume in zip(bars.index, bars['High'].tolist(), bars['Low'].tolist(),
+                                                bars['Close'].tolist(), bars['Volume'].fillna(0).tolist()):
+            self.apply(ts, high, low, close, volume)
+            self.last_ts = ts
+
+    def update(self, df):
+        """Folds in bars newer than the last committed one -> (rsi, vwap, vwap_stdev, supertrend)"""
+        new_bars = df if self.last_ts is None else df[df.index > self.last_ts]
+        if new_bars.empty:
+            return self.values()
+
+        self.commit(new_bars.iloc[:-1])
+        return self.values(new_bars.iloc[-1])
+
+    def values(self, forming_bar=None):
+        """(rsi, vwap, vwap_stdev, supertrend)"""
+        if forming_bar is None:
+            return (self.rsi.value(), *self.vwap.value(), self.supertrend.value())
+
+        # Apply the forming bar to O(period)-sized copies, leaving committed state untouched
+        high, low, close = float(forming_bar['High']), float(forming_bar['Low']), float(forming_bar['Close'])
+        volume = 0.0 if pd.isna(forming_bar['Volume']) else float(forming_bar['Volume'])
+        rsi, vwap, supertrend = self.rsi.clone(), copy.copy(self.vwap), copy.copy(self.supertrend)
+        rsi.update(close)
+        vwap.update(forming_bar.name, close, volume)
+        supertrend.update(high, low, close)
+        return (rsi.value(), *vwap.value(), supertrend.value())
+
+    @classmethod
+    def from_history(cls, df):
+        """Rebuilds state from a full bar history (after a restart or a gap)"""
+        state = cls()
+        if not df.empty:
+            state.commit(df.iloc[:-1])
+        return state
+
+_INDICATOR_STATES = {}
+_INDICATOR_STATES_LOCK = threading.Lock()
+
+def update_indicator_state(ticker, intraday_df):
+    """Incremental (rsi, vwap, vwap_stdev, supertrend) for a ticker; rebuilds from history when bars don't line up"""
+    with _INDICATOR_STATES_LOCK:
+        state = _INDICATOR_STATES.get(ticker)
+        # Unknown ticker, or the last committed bar is no longer in the window (restart, gap, rewritten history)
+        if state is None or state.last_ts is None or state.last_ts not in intraday_df.index:
+            state = TickerIndicatorState.from_history(intraday_df)
+            _INDICATOR_STATES[ticker] = state
+    return state.update(intraday_df)
+
 # --- Chart Generation ---
 
 def get_nifty_data():
@@ -135,6 +391,7 @@ def get_nifty_data():
         # Fetch 1d, 5m for Chart
         # Optimize: Fetch only 1 day of data for speed (Intraday View)
         # Previous might have been fetching 'max' or '5d' which is slow
+        throttle('yahoo')
         df = yf.download("^NSEI", period="1d", interval="5m", progress=False, auto_adjust=True)
         
         if df.empty: return pd.DataFrame(), False
@@ -218,174 +475,589 @@ def generate_nifty_chart():
         logging.error(f"Chart generation failed: {e}")
         return CHART_PATH, False
 
+# --- Retry Policy ---
+
+# HTTP statuses worth another attempt (throttling, gateway hiccups); anything else is final
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+RETRYABLE_NAME_HINTS = ("Timeout", "Connection", "RateLimit", "Throttl")
+
+def is_retryable(exc):
+    """Transient network/throttling errors are retried; parse/data errors are not"""
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(exc, 'status', None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    # NSE answers with an HTML challenge page (-> JSON decode error) while it throttles a client
+    if isinstance(exc, json.JSONDecodeError):
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return any(hint in type(exc).__name__ for hint in RETRYABLE_NAME_HINTS)
+
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def retry_call(fn, *args, retries=3, stage="", **kwargs):
+    """Runs one fetch stage, retrying only retryable errors; re-raises the last error when it gives up"""
+    for attempt in range(retries):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e) or attempt == retries - 1:
+                raise
+            delay = backoff_delay(attempt)
+            logging.warning(f"{stage} attempt {attempt + 1}/{retries} failed ({type(e).__name__}: {e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+# --- Local Resampling (15m & Daily from 5m) ---
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+def to_ist(df):
+    if df.index.tz is None:
+        df.index = df.index.tz_localize('UTC')
+    df.index = df.index.tz_convert('Asia/Kolkata')
+    return df
+
+def resample_ohlcv(df, rule):
+    """Vectorized OHLCV aggregation of finer bars ('15min' for intraday, '1D' for sessions)"""
+    if df.empty: return pd.DataFrame()
+    cols = {c: agg for c, agg in OHLCV_AGG.items() if c in df.columns}
+    df = to_ist(df[list(cols)].copy())
+    if rule == '1D':
+        # One row per IST session date (skips weekends/holidays instead of emitting empty bins)
+        out = df.groupby(df.index.normalize()).agg(cols)
+    else:
+        # Bins are anchored at midnight IST, so 15m bars line up with the 09:15 open
+        out = df.resample(rule, label='left', closed='left').agg(cols)
+    return out.dropna(subset=['Close'])
+
+def derive_bars(intraday_df):
+    """Builds the 15m and daily frames locally from a single 5m series"""
+    return {
+        '5m': intraday_df,
+        '15m': resample_ohlcv(intraday_df, '15min'),
+        '1d': resample_ohlcv(intraday_df, '1D'),
+    }
+
+# --- Batched Yahoo Download ---
+
+def fetch_yahoo_batch(tickers, period=FETCH_PERIOD, interval="5m", start=None):
+    """
+    Downloads OHLCV for the ticker list in grouped requests and splits it per ticker.
+    yfinance fires one chart request per symbol at once, so each group is at most the Yahoo
+    bucket's burst and takes its tokens before it is sent.
+    """
+    frames = {}
+    if not tickers: return frames
+    chunk_size = max(1, int(get_bucket('yahoo').burst))
+
+    # An explicit start (incremental refresh) replaces the rolling period
+    window = {'start': start} if start is not None else {'period': period}
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        symbols = [f"{ticker}.NS" for ticker in chunk]
+        try:
+            throttle('yahoo', cost=len(symbols))
+            raw = yf.download(
+                symbols, interval=interval, group_by='ticker',
+                auto_adjust=True, threads=True, progress=False, **window
+            )
+        except Exception as e:
+            logging.error(f"Batch download failed ({interval}, {len(symbols)} symbols): {e}")
+            continue
+
+        if raw is None or raw.empty: continue
+
+        for ticker, symbol in zip(chunk, symbols):
+            try:
+                if isinstance(raw.columns, pd.MultiIndex):
+                    if symbol not in raw.columns.get_level_values(0): continue
+                    df = raw[symbol]
+                else:
+                    df = raw
+                # Grouped frames share one index, so drop rows where this ticker had no bar
+                df = df.dropna(how='all')
+                if not df.empty:
+                    frames[ticker] = df.copy()
+            except Exception as e:
+                logging.error(f"Batch split failed for {ticker} ({interval}): {e}")
+
+    return frames
+
+def fetch_bars_batch(tickers, use_store=USE_BAR_STORE):
+    """One grouped 5m download -> {ticker: {'5m': df, '15m': df, '1d': df}}"""
+    if use_store:
+        intraday = fetch_intraday_incremental(tickers)
+    else:
+        intraday = fetch_yahoo_batch(tickers, period=FETCH_PERIOD, interval="5m")
+    # Tickers missing from the batch are left out so they fall back to the per-ticker path
+    return {ticker: derive_bars(df) for ticker, df in intraday.items()}
+
+def fetch_intraday_incremental(tickers, sessions=FETCH_SESSIONS, interval="5m"):
+    """
+    Reads the local bar store first and downloads only bars newer than the last stored one.
+    Cold (or stale) tickers get the full rolling window; warm ones get a handful of bars.
+    """
+    store = get_bar_store()
+    last_seen = store.last_timestamps(tickers, interval)
+    stale_before = pd.Timestamp.now(tz='Asia/Kolkata') - pd.Timedelta(days=sessions)
+
+    warm = [t for t in tickers if t in last_seen and last_seen[t] >= stale_before]
+    cold = [t for t in tickers if t not in warm]
+
+    fresh = {}
+    if cold:
+        fresh.update(fetch_yahoo_batch(cold, period=f"{sessions}d", interval=interval))
+    if warm:
+        # Re-request from the oldest last bar: it may have been in progress, and overlaps are upserted
+        start = min(last_seen[t] for t in warm)
+        fresh.update(fetch_yahoo_batch(warm, interval=interval, start=start))
+
+    appended = 0
+    for ticker, df in fresh.items():
+        try: appended += store.append(ticker, interval, df)
+        except Exception as e: logging.error(f"Bar store append failed for {ticker}: {e}")
+    logging.info(f"Bar store: {len(warm)} warm / {len(cold)} cold tickers, {appended} bars appended")
+    store.prune_if_due()
+
+    frames = {}
+    for ticker in tickers:
+        df = store.load(ticker, interval, sessions=sessions)
+        if df.empty and ticker in fresh:
+            df = fresh[ticker]
+        if not df.empty:
+            frames[ticker] = df
+    return frames
+
+# --- Live Quotes ---
+
+def empty_quote():
+    return {
+        'price': 0.0, 'open_price': 0.0, 'volume': 0, 'change': 0.0,
+        'pct_change': 0.0, 'delivery_pct': 0.0, 'company_name': ""
+    }
+
+def fetch_live_quote(ticker):
+    """Per-symbol quote via nse_eq (falls back to the F&O underlying price)"""
+    throttle('nse')
+    quote = nse_eq(ticker)
+    if isinstance(quote, dict) and 'priceInfo' in quote:
+        return parse_live_quote(quote)
+
+    result = empty_quote()
+    throttle('nse')
+    fno_quote = nse_fno(ticker)
+    if 'underlyingValue' in fno_quote:
+        result['price'] = safe_float(fno_quote.get('underlyingValue', 0))
+    return result
+
+def parse_live_quote(quote):
+    """Maps a quote-equity (nse_eq) response to the quote dict used by fetch_single_ticker"""
+    result = empty_quote()
+    
+    if isinstance(quote, dict) and 'priceInfo' in quote:
+        p_info = quote['priceInfo']
+        result['company_name'] = quote.get('info', {}).get('companyName', '')
+        result['price'] = safe_float(p_info.get('lastPrice', 0))
+        result['open_price'] = safe_float(p_info.get('open', 0))
+        result['volume'] = int(safe_float(p_info.get('totalTradedVolume', 0))) # API Volume
+        result['change'] = safe_float(p_info.get('change', 0))
+        result['pct_change'] = round(safe_float(p_info.get('pChange', 0)),2)
+        
+        # Fetch Delivery %
+        delivery_pct = 0.0
+        try:
+            meta = quote.get("metadata", {})
+            d_qty = safe_float(meta.get("deliveryQuantity", 0))
+            t_qty = safe_float(meta.get("tradedQuantity", 0))
+
+            if t_qty > 0:
+                delivery_pct = round((d_qty / t_qty) * 100, 2)
+
+        except:
+            delivery_pct = 0.0
+
+        
+        # Fallback Calc for Delivery %
+        if delivery_pct == 0 and 'securityWiseDP' in quote:
+            d_qty = safe_float(quote['securityWiseDP'].get('deliveryQuantity', 0))
+            t_qty = safe_float(quote['securityWiseDP'].get('quantityTraded', 0))
+            if t_qty > 0:
+                delivery_pct = round((d_qty / t_qty) * 100, 2)
+        result['delivery_pct'] = delivery_pct
+
+    return result
+
+def parse_index_quotes(payload):
+    """Maps the equity-stockIndices constituent rows to the same shape as fetch_live_quote"""
+    quotes = {}
+    if not isinstance(payload, dict): return quotes
+    
+    for item in payload.get('data', []):
+        # priority 1 is the index row itself
+        if item.get('priority', 0) != 0 or 'symbol' not in item: continue
+        quote = empty_quote()
+        quote['company_name'] = (item.get('meta') or {}).get('companyName', '')
+        quote['price'] = safe_float(item.get('lastPrice', 0))
+        quote['open_price'] = safe_float(item.get('open', 0))
+        quote['volume'] = int(safe_float(item.get('totalTradedVolume', 0)))
+        quote['change'] = safe_float(item.get('change', 0))
+        quote['pct_change'] = round(safe_float(item.get('pChange', 0)), 2)
+        quotes[item['symbol']] = quote
+    return quotes
+
+def fetch_bulk_quotes():
+    """One NIFTY 50 constituents request -> {symbol: quote} for the whole universe"""
+    try:
+        return parse_index_quotes(fetch_index_payload())
+    except Exception as e:
+        logging.error(f"Bulk quote fetch failed: {e}")
+        return {}
+
 # --- Main Fetch Logic ---
 
-def fetch_single_ticker(ticker, timestamp, nifty_weekly, max_retries=3):
-    success = False
-    retry_count = 0
+def fetch_intraday_history(ticker):
+    # raise_errors surfaces throttling/timeouts instead of an empty frame, so retry_call can classify them
+    throttle('yahoo')
+    return yf.Ticker(f"{ticker}.NS").history(period=FETCH_PERIOD, interval="5m", auto_adjust=True, raise_errors=True)
+
+def fetch_ticker_inputs(ticker, max_retries=3, bars=None, bulk_quote=None):
+    """I/O stages for one ticker -> (quote, bars) or None when no live quote could be had"""
+    # Each stage retries on its own; a stage that already succeeded is never refetched
     
-    while not success and retry_count < max_retries:
+    # A. Live Data (bulk index payload when available, else one nse_eq call)
+    quote = bulk_quote
+    if quote is None:
         try:
-            # A. Live Data
-            quote = nse_eq(ticker)
-            price, open_price, volume, delivery_pct, change, pct_change = 0.0, 0.0, 0, 0.0, 0.0, 0.0
-            company_name = ""
-            
-            if isinstance(quote, dict) and 'priceInfo' in quote:
-                p_info = quote['priceInfo']
-                company_name = quote.get('info', {}).get('companyName', '')
-                price = safe_float(p_info.get('lastPrice', 0))
-                open_price = safe_float(p_info.get('open', 0))
-                volume = int(safe_float(p_info.get('totalTradedVolume', 0))) # API Volume
-                change = safe_float(p_info.get('change', 0))
-                pct_change = round(safe_float(p_info.get('pChange', 0)),2)
-                
-                # Fetch Delivery %
-                try:
-                    meta = quote.get("metadata", {})
-                    d_qty = safe_float(meta.get("deliveryQuantity", 0))
-                    t_qty = safe_float(meta.get("tradedQuantity", 0))
-
-                    if t_qty > 0:
-                        delivery_pct = round((d_qty / t_qty) * 100, 2)
-
-                except:
-                    delivery_pct = 0.0
-
-                
-                # Fallback Calc for Delivery %
-                if delivery_pct == 0 and 'securityWiseDP' in quote:
-                    d_qty = safe_float(quote['securityWiseDP'].get('deliveryQuantity', 0))
-                    t_qty = safe_float(quote['securityWiseDP'].get('quantityTraded', 0))
-                    if t_qty > 0:
-                        delivery_pct = round((d_qty / t_qty) * 100, 2)
+            quote = retry_call(fetch_live_quote, ticker, retries=max_retries, stage=f"{ticker} live quote")
+        except Exception as e:
+            logging.error(f"Failed {ticker}: live quote stage gave up ({type(e).__name__}: {e})")
+            return None
 
-            else:
-                fno_quote = nse_fno(ticker)
-                if 'underlyingValue' in fno_quote:
-                    price = safe_float(fno_quote.get('underlyingValue', 0))
-            
-            groww_link = generate_groww_url(ticker, company_name)
+    # B. Intraday Bars (Yahoo). Batched mode: frames were already downloaded for the whole universe
+    ticker_bars = bars
+    if ticker_bars is None:
+        try:
+            raw_intraday = retry_call(fetch_intraday_history, ticker, retries=max_retries, stage=f"{ticker} intraday bars")
+        except Exception as e:
+            logging.error(f"{ticker}: intraday bars stage gave up ({type(e).__name__}: {e}); indicators left neutral")
+            raw_intraday = pd.DataFrame()
+        # C. Daily & 15m Bars: resampled locally from the 5m series, nothing to retry
+        ticker_bars = derive_bars(raw_intraday)
 
-            # B. Yahoo Finance Data (Intraday & Weekly)
-            yf_ticker = f"{ticker}.NS"
-            
-            try: intraday_df = yf.Ticker(yf_ticker).history(period="5d", interval="5m", auto_adjust=True)
-            except: intraday_df = pd.DataFrame()
+    return quote, ticker_bars
+
+def make_row(ticker, timestamp, quote, volume, rsi_val, vwap_val, supertrend, support_val,
+             resistance_val, trend_signal, correlation, vwap_stdev=0.0):
+    groww_link = generate_groww_url(ticker, quote['company_name'])
+    row = {
+        "Timestamp": timestamp,
+        "Ticker": ticker,
+        "Open Price": quote['open_price'],
+        "Current Price": quote['price'],
+        "Price Change": quote['change'],
+        "Percentage Change": quote['pct_change'],
+        "Volume": volume,
+        "RSI (5 Min)": round(rsi_val, 2),
+        "VWAP": round(vwap_val, 2),
+    }
+    bands = vwap_bands(vwap_val, vwap_stdev)
+    if bands:
+        row.update(zip(VWAP_BAND_COLUMNS, bands))
+    row.update({
+        "Supertrend": supertrend,
+        "Support": support_val,
+        "Resistance": resistance_val,
+        "Intraday Trend": trend_signal,
+        "Correlation with Nifty": round(correlation, 2),
+        "Link": f"{groww_link}?t={ticker}"
+    })
+    return row
+
+def build_ticker_row(ticker, timestamp, quote, ticker_bars):
+    """D. Indicators: deterministic on the bars, so they run once and keep defaults on failure"""
+    price, volume = quote['price'], quote['volume']
+
+    intraday_df = ticker_bars.get('5m', pd.DataFrame()).copy()
+    weekly_df = ticker_bars.get('15m', pd.DataFrame()).copy()
+    daily_df = ticker_bars.get('1d', pd.DataFrame())
+    
+    rsi_val, vwap_val, vwap_stdev, correlation = 0.0, 0.0, 0.0, 0.0
+    supertrend, trend_signal = "Neutral", "Neutral"
+    support_val, resistance_val = 0.0, 0.0
+    
+    try:
+        if not daily_df.empty and len(daily_df) >= 2:
+            # Get previous day's data (assuming last row is today/live, 2nd last is prev close)
+            # Note: yfinance often includes today as the last row with live data.
+            prev_day = daily_df.iloc[-2]
+            p_high = prev_day['High']
+            p_low = prev_day['Low']
+            p_close = prev_day['Close']
             
-            try: weekly_df = yf.Ticker(yf_ticker).history(period="5d", interval="15m", auto_adjust=True)
-            except: weekly_df = pd.DataFrame()
+            # Classic Pivot Point Formula
+            pivot = (p_high + p_low + p_close) / 3
+            r1 = (2 * pivot) - p_low
+            s1 = (2 * pivot) - p_high
             
-            rsi_val, vwap_val, correlation = 0.0, 0.0, 0.0
-            supertrend, trend_signal = "Neutral", "Neutral"
-            support_val, resistance_val = 0.0, 0.0
+            resistance_val = round(r1, 2)
+            support_val = round(s1, 2)
+    except Exception as e:
+        logging.error(f"Support/Resist calc error for {ticker}: {e}")
+
+    try:
+        if not intraday_df.empty:
+            # Convert to IST
+            intraday_df = to_ist(intraday_df)
             
-            try:
-                daily_df = yf.Ticker(yf_ticker).history(period="5d", interval="1d", auto_adjust=True)
-                if not daily_df.empty and len(daily_df) >= 2:
-                    # Get previous day's data (assuming last row is today/live, 2nd last is prev close)
-                    # Note: yfinance often includes today as the last row with live data.
-                    prev_day = daily_df.iloc[-2]
-                    p_high = prev_day['High']
-                    p_low = prev_day['Low']
-                    p_close = prev_day['Close']
-                    
-                    # Classic Pivot Point Formula
-                    pivot = (p_high + p_low + p_close) / 3
-                    r1 = (2 * pivot) - p_low
-                    s1 = (2 * pivot) - p_high
-                    
-                    resistance_val = round(r1, 2)
-                    support_val = round(s1, 2)
-            except Exception as e:
-                logging.error(f"Support/Resist calc error for {ticker}: {e}")
-
-            if not intraday_df.empty:
-                # Convert to IST
-                if intraday_df.index.tz is None:
-                    intraday_df.index = intraday_df.index.tz_localize('UTC')
-                intraday_df.index = intraday_df.index.tz_convert('Asia/Kolkata')
-                
-                # Better Volume Logic
-                if volume == 0:
-                    today_date = pd.Timestamp.now(tz='Asia/Kolkata').normalize()
-                    today_data = intraday_df[intraday_df.index.normalize() == today_date]
-                    if not today_data.empty:
-                        volume = int(today_data['Volume'].sum())
+            # Better Volume Logic
+            if volume == 0:
+                today_date = pd.Timestamp.now(tz='Asia/Kolkata').normalize()
+                today_data = intraday_df[intraday_df.index.normalize() == today_date]
+                if not today_data.empty:
+                    volume = int(today_data['Volume'].sum())
 
+            if PER_TICKER_INCREMENTAL_STATE:
+                rsi_val, vwap_val, vwap_stdev, supertrend = update_indicator_state(ticker, intraday_df)
+            else:
                 rsi_val = calculate_rsi(intraday_df['Close'], period=14)
-                vwap_val = calculate_vwap(intraday_df)
+                vwap_val, vwap_stdev = session_vwap(intraday_df)
                 supertrend = calculate_supertrend(intraday_df)
-                
-                if price > vwap_val: trend_signal = "Bullish"
-                else: trend_signal = "Bearish"
+            vwap_val = round(vwap_val, 2)
             
-            if not weekly_df.empty:
-                support_val, resistance_val = calculate_levels(weekly_df)
-                if not nifty_weekly.empty and len(weekly_df) > 10:
-                    try:
-                        stock_close = weekly_df['Close']
-                        stock_close.index = pd.to_datetime(stock_close.index).normalize()
-                        if stock_close.index.tz is not None: 
-                            stock_close.index = stock_close.index.tz_localize(None)
-                        
-                        aligned_nifty = nifty_weekly.reindex(stock_close.index).ffill()
-                        correlation = round(float(stock_close.corr(aligned_nifty)), 2)
-                    except: correlation = 0.0
-
-            data = {
-                "Timestamp": timestamp,
-                "Ticker": ticker,
-                "Open Price": open_price,
-                "Current Price": price,
-                "Price Change": change,
-                "Percentage Change": pct_change,
-                "Volume": volume,
-                "RSI (5 Min)": round(rsi_val, 2),
-                "VWAP": round(vwap_val, 2),
-                "Supertrend": supertrend,
-                "Support": support_val,
-                "Resistance": resistance_val,
-                "Intraday Trend": trend_signal,
-                "Correlation with Nifty": round(correlation, 2),
-                "Link": f"{groww_link}?t={ticker}"
-            }
-            logging.info(f"Fetched {ticker}: {price} | ST: {supertrend} | Vol: {volume}")
-            return data
+            if price > vwap_val: trend_signal = "Bullish"
+            else: trend_signal = "Bearish"
+        
+        if not weekly_df.empty:
+            support_val, resistance_val = calculate_levels(weekly_df)
+    except Exception as e:
+        logging.error(f"Indicator stage failed for {ticker} ({type(e).__name__}: {e}); keeping defaults")
 
-        except Exception as e:
-            retry_count += 1
-            time.sleep(1)
-    
-    logging.error(f"Failed {ticker}")
-    return None
+    logging.info(f"Fetched {ticker}: {price} | ST: {supertrend} | Vol: {volume}")
+    return make_row(ticker, timestamp, quote, volume, rsi_val, vwap_val, supertrend,
+                    support_val, resistance_val, trend_signal, correlation, vwap_stdev)
+
+def fetch_single_ticker(ticker, timestamp, max_retries=3, bars=None, bulk_quote=None):
+    """-> (row, quote, bars) so the caller can run universe-wide stats and keep the inputs for scoped refreshes"""
+    inputs = fetch_ticker_inputs(ticker, max_retries, bars, bulk_quote)
+    if inputs is None: return None
+    quote, ticker_bars = inputs
+    return build_ticker_row(ticker, timestamp, quote, ticker_bars), quote, ticker_bars
+
+def prepare_nifty_closes(nifty_data):
+    """Close series of the 15m Nifty frame on the IST intraday clock (the correlation benchmark)"""
+    nifty_closes = pd.Series(dtype='float64')
+    if 'Close' in nifty_data.columns: nifty_closes = nifty_data['Close']
+    if isinstance(nifty_closes, pd.DataFrame): nifty_closes = nifty_closes.iloc[:, 0]
+    if not nifty_closes.empty:
+        nifty_closes = to_ist(nifty_closes.dropna().copy())
+    return nifty_closes
+
+# --- Scanners ---
+# Momentum / volatility / range / volume columns are computed once per snapshot for the whole
+# universe, and every scanner list is ranked once per snapshot; page views only slice them.
+
+SCANNER_COLUMNS = ['Momentum %', 'ATR %', 'Range Expansion', 'Volume Surge']
+
+# Scanner name -> (column, ascending)
+SCANNERS = {
+    'Top Gainers': ('Percentage Change', False),
+    'Top Losers': ('Percentage Change', True),
+    'Momentum': ('Momentum %', False),
+    'Volatility': ('ATR %', False),
+    'Range Expansion': ('Range Expansion', False),
+    'Volume Surge': ('Volume Surge', False),
+}
+
+_SCANNER_LISTS = OrderedDict()
+_SCANNER_LISTS_LOCK = threading.Lock()
+
+def attach_scanners(df, frames):
+    """Adds SCANNER_COLUMNS to a snapshot frame from each ticker's 5m bars (NaN where a ticker has none)"""
+    if df.empty or 'Ticker' not in df.columns:
+        return df
+    # Imported lazily: the panel engine reuses this module's helpers
+    from indicator_panel import scanner_frame
+    metrics = scanner_frame(frames)
+    for column in SCANNER_COLUMNS:
+        df[column] = df['Ticker'].map(metrics[column]) if column in metrics.columns else np.nan
+    return df
+
+def rank_scanners(df, version, top_n=SCANNER_TOP_N):
+    """{scanner: snapshot index labels of its top-N rows, best first}, ranked once per snapshot version"""
+    with _SCANNER_LISTS_LOCK:
+        cached = _SCANNER_LISTS.get(version)
+    if cached is not None:
+        return cached
+
+    lists = {}
+    for name, (column, ascending) in SCANNERS.items():
+        if column not in df.columns:
+            lists[name] = df.index[:0]
+            continue
+        values = pd.to_numeric(df[column], errors='coerce').dropna()
+        lists[name] = values.sort_values(ascending=ascending, kind='stable').index[:top_n]
+
+    with _SCANNER_LISTS_LOCK:
+        _SCANNER_LISTS[version] = lists
+        while len(_SCANNER_LISTS) > 4:
+            _SCANNER_LISTS.popitem(last=False)
+    return lists
+
+# --- Snapshot Schema ---
+# The snapshot leaves the fetcher with fixed dtypes (float32 prices/indicators, int64 Volume,
+# categorical trends, a preformatted Volume Display), so app reruns never convert columns again.
+
+TREND_DTYPE = pd.CategoricalDtype(["Bullish", "Bearish", "Neutral"])
+CATEGORY_COLUMNS = ['Supertrend', 'Intraday Trend']
+TEXT_COLUMNS = ['Timestamp', 'Ticker', 'Link']
+
+def apply_snapshot_schema(df):
+    """Casts a raw snapshot frame in place to the fixed schema"""
+    if df.empty:
+        return df
+    for column in df.columns:
+        if column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype(TREND_DTYPE)
+        elif column == 'Volume':
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64')
+        elif column not in TEXT_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float32')
+    if 'Volume' in df.columns:
+        df['Volume Display'] = df['Volume'].map('{:,}'.format).where(df['Volume'] != 0, "--")
+    return df
+
+def export_frame(df):
+    """Snapshot with plain dtypes (float64 rounded to 2dp, text trends) for Excel and JSON consumers"""
+    df = df.drop(columns=['Volume Display'], errors='ignore')
+    floats = df.select_dtypes('float32').columns
+    df = df.astype({**{c: 'float64' for c in floats}, **{c: object for c in CATEGORY_COLUMNS if c in df.columns}})
+    return df.round({c: 2 for c in floats})
+
+# Quotes and bars of the last refresh: a scoped refresh re-downloads one and reuses the other
+_LAST_INPUTS = {}
+_LAST_INPUTS_LOCK = threading.Lock()
+
+def remember_inputs(quotes, bars, is_bearish, nifty_closes):
+    """Keeps a refresh's inputs for the next scoped refresh (both engines record theirs)"""
+    with _LAST_INPUTS_LOCK:
+        _LAST_INPUTS.update(quotes=quotes, bars=bars, is_bearish=is_bearish, nifty_closes=nifty_closes)
+
+# Refreshes of every scope run one at a time: they share _LAST_INPUTS and the incremental
+# indicator states. Each gets a monotonic snapshot id when it starts, so ids follow data age.
+_FETCH_LOCK = threading.Lock()
+_SNAPSHOT_IDS = itertools.count(1)
+
+def fetch_nse_data(tickers, timestamp, max_retries=3, batch_download=True, bulk_quotes=True, engine=FETCH_ENGINE,
+                   indicator_engine=INDICATOR_ENGINE, scope="all"):
+    """
+    scope='all' fetches everything; 'quotes' refetches live quotes on top of the last bars,
+    'bars' refetches bars (and the Nifty series) on top of the last quotes.
+    The snapshot id is recorded in df.attrs['version'].
+    """
+    with _FETCH_LOCK:
+        version = next(_SNAPSHOT_IDS)
+        df, is_bearish = _fetch_nse_data(tickers, timestamp, max_retries, batch_download, bulk_quotes, engine,
+                                         indicator_engine, scope, version)
+    df.attrs['version'] = version
+    return df, is_bearish
+
+def _fetch_nse_data(tickers, timestamp, max_retries, batch_download, bulk_quotes, engine, indicator_engine, scope, version):
+    with _LAST_INPUTS_LOCK:
+        last = dict(_LAST_INPUTS)
+    if not last:
+        scope = "all"   # Nothing to reuse yet
+
+    if engine == "async" and scope == "all":
+        # Imported lazily: the asyncio engine reuses this module's parsers and indicators.
+        # Scoped refreshes run on the threads path below, on top of the inputs it recorded.
+        from async_fetcher import run_async_fetch
+        return run_async_fetch(tickers, timestamp, max_retries, indicator_engine=indicator_engine, version=version)
 
-def fetch_nse_data(tickers, timestamp, max_retries=3):
     results = []
-    _, is_bearish = get_nifty_data()
+    if scope == "quotes":
+        is_bearish, nifty_closes = last['is_bearish'], last['nifty_closes']
+        bars_by_ticker = last['bars']
+    else:
+        _, is_bearish = get_nifty_data()
 
-    nifty_weekly = pd.Series(dtype='float64')
-    try:
-        nifty_data = yf.download("^NSEI", period="5d", interval="15m", progress=False, auto_adjust=True)
-        if 'Close' in nifty_data.columns: nifty_weekly = nifty_data['Close']
-        if isinstance(nifty_weekly, pd.DataFrame): nifty_weekly = nifty_weekly.iloc[:, 0]
-        if not nifty_weekly.empty:
-            nifty_weekly.index = pd.to_datetime(nifty_weekly.index).normalize()
-            if nifty_weekly.index.tz is not None: 
-                nifty_weekly.index = nifty_weekly.index.tz_localize(None)
-    except: pass
-
-    # Parallel Execution
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_ticker = {
-            executor.submit(fetch_single_ticker, ticker, timestamp, nifty_weekly, max_retries): ticker 
-            for ticker in tickers
-        }
-        
-        for future in concurrent.futures.as_completed(future_to_ticker):
-            data = future.result()
-            if data:
-                results.append(data)
+        nifty_closes = pd.Series(dtype='float64')
+        try:
+            throttle('yahoo')
+            nifty_data = yf.download("^NSEI", period=f"{fetch_sessions(['correlation'])}d", interval="15m",
+                                     progress=False, auto_adjust=True)
+            nifty_closes = prepare_nifty_closes(nifty_data)
+        except: pass
+
+        # Batched Yahoo leg: one grouped 5m download for the whole universe
+        bars_by_ticker = {}
+        if batch_download:
+            bars_by_ticker = fetch_bars_batch(tickers)
+
+    # Bulk live quotes: one index request fills price columns for every constituent.
+    # Symbols missing from the payload fall back to a per-ticker nse_eq call.
+    quotes_by_ticker = {}
+    if scope == "bars":
+        quotes_by_ticker = last['quotes']
+    elif bulk_quotes:
+        quotes_by_ticker = fetch_bulk_quotes()
+        logging.info(f"Bulk quotes: {len([t for t in tickers if t in quotes_by_ticker])}/{len(tickers)} from index payload")
+
+    if indicator_engine == "panel":
+        # Worker threads do I/O only; indicators run for the whole universe in one vectorized pass
+        inputs = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+            future_to_ticker = {
+                executor.submit(fetch_ticker_inputs, ticker, max_retries, bars_by_ticker.get(ticker), quotes_by_ticker.get(ticker)): ticker 
+                for ticker in tickers
+            }
+            for future in concurrent.futures.as_completed(future_to_ticker):
+                data = future.result()
+                if data:
+                    inputs[future_to_ticker[future]] = data
+
+        # Imported lazily: the panel engine reuses this module's row builder
+        from indicator_panel import compute_panel_rows
+        results = compute_panel_rows(inputs, timestamp)
+        quotes_used = {ticker: quote for ticker, (quote, _) in inputs.items()}
+        bars_used = {ticker: bars for ticker, (_, bars) in inputs.items()}
+    else:
+        # Parallel Execution
+        quotes_used, bars_used = {}, {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+            future_to_ticker = {
+                executor.submit(fetch_single_ticker, ticker, timestamp, max_retries, bars_by_ticker.get(ticker), quotes_by_ticker.get(ticker)): ticker 
+                for ticker in tickers
+            }
+            
+            for future in concurrent.futures.as_completed(future_to_ticker):
+                data = future.result()
+                if data:
+                    row, quote, ticker_bars = data
+                    results.append(row)
+                    quotes_used[future_to_ticker[future]] = quote
+                    bars_used[future_to_ticker[future]] = ticker_bars
+
+    if results:
+        remember_inputs(quotes_used, bars_used, is_bearish, nifty_closes)
+
+    df = pd.DataFrame(results)
+    # Correlation with Nifty: one aligned matrix for the whole universe, cached under this snapshot's id
+    attach_correlation(df, {t: b.get('15m', pd.DataFrame()) for t, b in bars_used.items()}, nifty_closes, version)
+    # Classic / Fibonacci / Camarilla levels, computed once per trading day
+    attach_pivots(df, {t: b.get('1d', pd.DataFrame()) for t, b in bars_used.items()})
+    attach_scanners(df, {t: b.get('5m', pd.DataFrame()) for t, b in bars_used.items()})
+    apply_snapshot_schema(df)
+    rank_scanners(df, version)
+
+    logging.info(f"Success: {len(results)}/{len(tickers)} (scope: {scope})")
+    logging.info(f"Rate limiter: {format_stats()}")
+    return df, is_bearish
 
-    logging.info(f"Success: {len(results)}/{len(tickers)}")
-    return pd.DataFrame(results), is_bearish
\ No newline at end of file
+def fetch_market_snapshot(tickers, scope="all"):
+    """One refresh -> (df, is_bearish, timestamp, snapshot id); shared entry point for the app and background jobs"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    df, is_bearish = fetch_nse_data(tickers, timestamp, scope=scope)
+    return df, is_bearish, timestamp, df.attrs['version']
@@ -0,0 +1,80 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+# --- Pivot Level Suite ---
+# Classic, Fibonacci and Camarilla R1-R3 / S1-S3 from every ticker's previous-session OHLC.
+# Levels cannot change intraday, so each session's table is computed once (one vectorized call
+# over the universe) and reused by every refresh of that trading day.
+
+PIVOT_SETS = ['Classic', 'Fibonacci', 'Camarilla']
+LEVELS = ['R1', 'R2', 'R3', 'S1', 'S2', 'S3']
+PIVOT_COLUMNS = [f"{pivot_set} {level}" for pivot_set in PIVOT_SETS for level in LEVELS]
+
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()
+
+def pivot_levels(high, low, close):
+    """Previous-session high/low/close arrays -> {'<Set> <Level>': array} for every set and level"""
+    high, low, close = (np.asarray(a, dtype='float64') for a in (high, low, close))
+    pivot = (high + low + close) / 3
+    span = high - low
+    levels = {
+        'Classic': {
+            'R1': 2 * pivot - low, 'R2': pivot + span, 'R3': high + 2 * (pivot - low),
+            'S1': 2 * pivot - high, 'S2': pivot - span, 'S3': low - 2 * (high - pivot),
+        },
+        'Fibonacci': {
+            'R1': pivot + 0.382 * span, 'R2': pivot + 0.618 * span, 'R3': pivot + span,
+            'S1': pivot - 0.382 * span, 'S2': pivot - 0.618 * span, 'S3': pivot - span,
+        },
+        'Camarilla': {
+            'R1': close + span * 1.1 / 12, 'R2': close + span * 1.1 / 6, 'R3': close + span * 1.1 / 4,
+            'S1': close - span * 1.1 / 12, 'S2': close - span * 1.1 / 6, 'S3': close - span * 1.1 / 4,
+        },
+    }
+    return {f"{pivot_set} {level}": np.round(values, 2)
+            for pivot_set, by_level in levels.items() for level, values in by_level.items()}
+
+def previous_sessions(daily_frames):
+    """{ticker: daily frame} -> frame of (Session, High, Low, Close) per ticker, Session = the current session's date"""
+    records = {}
+    for ticker, daily_df in daily_frames.items():
+        if daily_df is None or len(daily_df) < 2: continue
+        prev_day = daily_df.iloc[-2]
+        records[ticker] = (daily_df.index[-1].date(), prev_day['High'], prev_day['Low'], prev_day['Close'])
+    return pd.DataFrame.from_dict(records, orient='index', columns=['Session', 'High', 'Low', 'Close'])
+
+def pivot_table(daily_frames):
+    """Ticker-indexed table of PIVOT_COLUMNS; only tickers not yet cached for their session are computed"""
+    prev = previous_sessions(daily_frames)
+    if prev.empty:
+        return pd.DataFrame(columns=PIVOT_COLUMNS)
+
+    tables = []
+    with _TABLES_LOCK:
+        for session, group in prev.groupby('Session'):
+            cached = _TABLES.get(session, pd.DataFrame(columns=PIVOT_COLUMNS))
+            missing = group.loc[group.index.difference(cached.index)]
+            if not missing.empty:
+                fresh = pd.DataFrame(pivot_levels(missing['High'], missing['Low'], missing['Close']), index=missing.index)
+                cached = fresh if cached.empty else pd.concat([cached, fresh])
+                _TABLES[session] = cached
+                logging.info(f"Pivot levels: {len(fresh)} tickers computed for {session}")
+            tables.append(cached.loc[group.index])
+
+        # Yesterday's levels are dead once a newer session is cached
+        for session in sorted(_TABLES)[:-2]:
+            del _TABLES[session]
+
+    return pd.concat(tables)
+
+def attach_pivots(df, daily_frames):
+    """Adds the pivot columns to a snapshot frame (NaN where a ticker has no previous session)"""
+    if df.empty or 'Ticker' not in df.columns:
+        return df
+    table = pivot_table(daily_frames)
+    for column in PIVOT_COLUMNS:
+        df[column] = df['Ticker'].map(table[column]).astype(float)
+    return df
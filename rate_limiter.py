@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+# --- Process-wide Token Buckets (one per upstream host) ---
+# Every outbound NSE/Yahoo call takes a token first, so concurrent Streamlit sessions,
+# fetch workers and the async engine share one budget per host instead of racing.
+
+DEFAULT_LIMITS = {
+    'nse':   {'rate': 3.0,  'burst': 5},    # tokens per second, bucket size
+    'yahoo': {'rate': 10.0, 'burst': 20},
+}
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        # Counters
+        self.acquired = 0
+        self.waits = 0
+        self.waited_seconds = 0.0
+        self.max_wait = 0.0
+
+    def reserve(self, cost=1):
+        """Takes `cost` tokens now and returns how long the caller must wait before using them"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: later callers queue behind earlier reservations
+            self.tokens -= cost
+            wait = max(0.0, -self.tokens / self.rate)
+
+            self.acquired += cost
+            if wait > 0:
+                self.waits += 1
+                self.waited_seconds += wait
+                self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def acquire(self, cost=1):
+        wait = self.reserve(cost)
+        if wait > 0: time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, cost=1):
+        wait = self.reserve(cost)
+        if wait > 0: await asyncio.sleep(wait)
+        return wait
+
+    def stats(self):
+        with self.lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'acquired': self.acquired,
+                'waits': self.waits,
+                'waited_seconds': round(self.waited_seconds, 3),
+                'max_wait': round(self.max_wait, 3),
+            }
+
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+def configure(limits):
+    """Replaces the per-host limits ({host: {'rate': r, 'burst': b}}); counters restart"""
+    with _BUCKETS_LOCK:
+        _BUCKETS.clear()
+        for host, cfg in limits.items():
+            _BUCKETS[host] = TokenBucket(cfg['rate'], cfg['burst'])
+
+def get_bucket(host):
+    with _BUCKETS_LOCK:
+        if host not in _BUCKETS:
+            cfg = DEFAULT_LIMITS.get(host, DEFAULT_LIMITS['yahoo'])
+            _BUCKETS[host] = TokenBucket(cfg['rate'], cfg['burst'])
+        return _BUCKETS[host]
+
+def throttle(host, cost=1):
+    """Blocks until `cost` requests to `host` fit in its bucket; returns seconds waited"""
+    return get_bucket(host).acquire(cost)
+
+async def throttle_async(host, cost=1):
+    return await get_bucket(host).acquire_async(cost)
+
+def get_stats():
+    """{host: counters} - time spent waiting shows how close we run to the configured limits"""
+    with _BUCKETS_LOCK:
+        buckets = dict(_BUCKETS)
+    return {host: bucket.stats() for host, bucket in buckets.items()}
+
+def format_stats():
+    return " | ".join(
+        f"{host}: {s['acquired']} req, {s['waits']} waits, {s['waited_seconds']:.2f}s waited"
+        for host, s in get_stats().items()
+    )
@@ -0,0 +1,183 @@
+import ast
+import re
+import logging
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# --- Screener Expressions ---
+# User screens like  RSI < 30 and Supertrend == "Bullish" and Volume > 1e6  are parsed once,
+# checked against a whitelist of AST nodes, rewritten into pandas mask operations and compiled.
+# The compiled form is cached, so re-running saved screens on a refresh is a few vectorized ops.
+
+# Short names for the snapshot columns; any column is also reachable by its name with
+# non-word characters turned into underscores (e.g. RSI_5_Min, Classic_R1, Percentage_Change)
+ALIASES = {
+    'RSI': 'RSI (5 Min)',
+    'Price': 'Current Price',
+    'Open': 'Open Price',
+    'Change': 'Price Change',
+    'ChangePct': 'Percentage Change',
+    'Trend': 'Intraday Trend',
+    'Corr': 'Correlation with Nifty',
+    'Momentum': 'Momentum %',
+    'ATR': 'ATR %',
+    'RangeExpansion': 'Range Expansion',
+    'VolumeSurge': 'Volume Surge',
+}
+
+COMPARE_OPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq, ast.In, ast.NotIn)
+ARITH_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+MAX_LENGTH = 500
+
+class ScreenerError(ValueError):
+    """Invalid screen expression (message is safe to show to the user)"""
+
+def identifier(column):
+    return re.sub(r'\W+', '_', column).strip('_')
+
+def resolve_names(columns):
+    """{name usable in an expression: column}"""
+    names = {identifier(c): c for c in columns}
+    names.update({alias: column for alias, column in ALIASES.items() if column in columns})
+    return names
+
+class _MaskBuilder(ast.NodeTransformer):
+    """Validates the tree and rewrites Python boolean logic into element-wise mask operations"""
+
+    def __init__(self, names, numeric):
+        self.names = names
+        self.numeric = numeric
+        self.used = set()
+
+    def arithmetic_operand(self, node):
+        # Text columns would let 'Ticker * 100000000' build huge strings on the shared server
+        if isinstance(node, ast.Subscript) and node.slice.value not in self.numeric:
+            raise ScreenerError(f"Arithmetic works on numbers only; '{node.slice.value}' is not a numeric column")
+        return node
+
+    def generic_visit(self, node):
+        raise ScreenerError(f"Unsupported syntax: {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_BoolOp(self, node):
+        # a and b and c -> (a & b) & c
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        values = [self.visit(v) for v in node.values]
+        result = values[0]
+        for value in values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=operand)
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            return ast.UnaryOp(op=node.op, operand=self.arithmetic_operand(operand))
+        raise ScreenerError("Only 'not', '-' and '+' are allowed as unary operators")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, ARITH_OPS):
+            raise ScreenerError("Only + - * / are allowed in arithmetic")
+        if any(isinstance(side, ast.Constant) and isinstance(side.value, str) for side in (node.left, node.right)):
+            raise ScreenerError("Arithmetic works on numbers only")
+        return ast.BinOp(left=self.arithmetic_operand(self.visit(node.left)), op=node.op,
+                         right=self.arithmetic_operand(self.visit(node.right)))
+
+    def visit_Compare(self, node):
+        # a < b < c -> (a < b) & (b < c); x in [..] -> x.isin([..])
+        operands = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        parts = []
+        for op, left, right in zip(node.ops, operands, operands[1:]):
+            if not isinstance(op, COMPARE_OPS):
+                raise ScreenerError("Unsupported comparison")
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(right, (ast.List, ast.Tuple)):
+                    raise ScreenerError("'in' needs a list of values, e.g. Supertrend in [\"Bullish\", \"Neutral\"]")
+                part = ast.Call(func=ast.Attribute(value=left, attr='isin', ctx=ast.Load()),
+                                args=[ast.List(elts=right.elts, ctx=ast.Load())], keywords=[])
+                if isinstance(op, ast.NotIn):
+                    part = ast.UnaryOp(op=ast.Invert(), operand=part)
+            else:
+                part = ast.Compare(left=left, ops=[op], comparators=[right])
+            parts.append(part)
+        result = parts[0]
+        for part in parts[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+        return result
+
+    def visit_Name(self, node):
+        if node.id in ('True', 'False'):
+            return ast.Constant(value=node.id == 'True')
+        column = self.names.get(node.id)
+        if column is None:
+            raise ScreenerError(f"Unknown column '{node.id}'")
+        self.used.add(column)
+        # cols["<column>"]
+        return ast.Subscript(value=ast.Name(id='cols', ctx=ast.Load()), slice=ast.Constant(value=column), ctx=ast.Load())
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float, str, bool)):
+            raise ScreenerError("Only numbers, strings and True/False are allowed as values")
+        return node
+
+    def visit_List(self, node):
+        if not all(isinstance(e, ast.Constant) for e in node.elts):
+            raise ScreenerError("Lists may only contain literal values")
+        return ast.List(elts=[self.visit_Constant(e) for e in node.elts], ctx=ast.Load())
+
+    visit_Tuple = visit_List
+
+def numeric_columns(df):
+    return frozenset(df.select_dtypes(include='number').columns)
+
+@lru_cache(maxsize=256)
+def compile_screen(expression, columns, numeric):
+    """
+    Parses + validates once per (expression, column set, numeric columns) -> (code object, columns used).
+    Only columns in `numeric` may take part in arithmetic.
+    """
+    expression = expression.strip()
+    if not expression:
+        raise ScreenerError("Empty expression")
+    if len(expression) > MAX_LENGTH:
+        raise ScreenerError(f"Expression longer than {MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ScreenerError(f"Syntax error: {e.msg}") from None
+
+    builder = _MaskBuilder(resolve_names(columns), numeric)
+    tree = ast.fix_missing_locations(builder.visit(tree))
+    return compile(tree, '<screen>', 'eval'), frozenset(builder.used)
+
+def evaluate(expression, df):
+    """Boolean mask over df's rows; rows where a comparison hits NaN evaluate False"""
+    code, _ = compile_screen(expression, tuple(df.columns), numeric_columns(df))
+    try:
+        result = eval(code, {'__builtins__': {}}, {'cols': df})
+    except Exception as e:
+        raise ScreenerError(f"Could not evaluate: {e}") from None
+
+    if isinstance(result, pd.Series) and pd.api.types.is_bool_dtype(result):
+        return result.astype(bool)
+    if isinstance(result, (bool, np.bool_)):
+        return pd.Series(bool(result), index=df.index)
+    raise ScreenerError("Expression must be a condition (e.g. RSI < 30), not a value")
+
+def screen(expression, df):
+    return df[evaluate(expression, df)]
+
+def run_screens(screens, df):
+    """{name: expression} -> {name: matching rows}; a broken screen is logged and skipped"""
+    results = {}
+    for name, expression in screens.items():
+        try:
+            results[name] = screen(expression, df)
+        except ScreenerError as e:
+            logging.warning(f"Screen '{name}' skipped: {e}")
+    return results
@@ -0,0 +1,51 @@
+import threading
+import logging
+
+# --- Single-Flight Request Coalescing ---
+# The first caller for a key runs the work; every caller that arrives while it is
+# in flight blocks on the same result instead of starting its own upstream refresh.
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the key before waking waiters so the next caller after this point starts fresh
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+            if call.waiters:
+                logging.info(f"Single-flight '{key}': {call.waiters} concurrent callers shared one result")
+        return call.result
+
+# Process-wide group shared by every Streamlit session (modules persist across reruns)
+market_flight = SingleFlight()
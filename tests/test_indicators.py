@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import nse_fetcher as nf
+from indicator_panel import compute_panel_rows
+
+
+def make_bars(days=5, seed=0, start='2026-10-12'):
+    """Random-walk 5m OHLCV bars over `days` full IST sessions"""
+    rng = np.random.default_rng(seed)
+    index = []
+    for day in pd.bdate_range(start, periods=days):
+        index += list(pd.date_range(day + pd.Timedelta('9h15min'), day + pd.Timedelta('15h25min'), freq='5min'))
+    index = pd.DatetimeIndex(index).tz_localize('Asia/Kolkata')
+    close = 100 + np.cumsum(rng.normal(0, 0.3, len(index)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(len(index)) * 0.2
+    low = np.minimum(open_, close) - rng.random(len(index)) * 0.2
+    volume = rng.integers(1000, 50000, len(index)).astype(float)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+
+def reference_supertrend(df, period=7, multiplier=3):
+    """The per-row loop supertrend_kernel replaced -> uptrend per bar"""
+    df = df.copy()
+    hl2 = (df['High'] + df['Low']) / 2
+    df['tr0'] = abs(df['High'] - df['Low'])
+    df['tr1'] = abs(df['High'] - df['Close'].shift(1))
+    df['tr2'] = abs(df['Low'] - df['Close'].shift(1))
+    df['tr'] = df[['tr0', 'tr1', 'tr2']].max(axis=1)
+    df['atr'] = df['tr'].ewm(alpha=1/period, adjust=False).mean()
+    df['final_upper'] = hl2 + multiplier * df['atr']
+    df['final_lower'] = hl2 - multiplier * df['atr']
+    df['uptrend'] = True
+
+    for i in range(1, len(df)):
+        basic_upper, basic_lower = df['final_upper'].iloc[i], df['final_lower'].iloc[i]
+        prev_upper, prev_lower = df['final_upper'].iloc[i-1], df['final_lower'].iloc[i-1]
+        prev_close, close = df['Close'].iloc[i-1], df['Close'].iloc[i]
+
+        if not (basic_upper < prev_upper or prev_close > prev_upper):
+            df.loc[df.index[i], 'final_upper'] = prev_upper
+        if not (basic_lower > prev_lower or prev_close < prev_lower):
+            df.loc[df.index[i], 'final_lower'] = prev_lower
+
+        if df['uptrend'].iloc[i-1]:
+            df.loc[df.index[i], 'uptrend'] = not (close < df['final_lower'].iloc[i])
+        else:
+            df.loc[df.index[i], 'uptrend'] = close > df['final_upper'].iloc[i]
+    return df['uptrend'].astype(bool).to_numpy()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_supertrend_kernel_matches_loop(seed):
+    df = make_bars(days=2, seed=seed)
+    if seed == 3:
+        df.iloc[5:8, df.columns.get_loc('High')] = np.nan
+    uptrend, _, _ = nf.supertrend_kernel(df['High'], df['Low'], df['Close'])
+    np.testing.assert_array_equal(uptrend, reference_supertrend(df))
+
+
+@pytest.mark.parametrize('case', ['aligned', 'one_bar_short', 'gaps', 'late_start'])
+def test_panel_rows_match_per_ticker_rows(monkeypatch, case):
+    # Reference rows recompute from the window, like the panel engine
+    monkeypatch.setattr(nf, 'PER_TICKER_INCREMENTAL_STATE', False)
+    rng = np.random.default_rng(5)
+
+    inputs = {}
+    for k in range(10):
+        bars = make_bars(seed=k)
+        if k % 2:
+            if case == 'one_bar_short':
+                bars = bars.iloc[:-1]
+            elif case == 'gaps':
+                bars = bars.drop(bars.index[rng.choice(len(bars) - 1, 40, replace=False)])
+            elif case == 'late_start':
+                bars = bars.iloc[200 + k:]
+        quote = nf.empty_quote() | {'price': float(bars['Close'].iloc[-1]), 'company_name': f"T{k}"}
+        inputs[f"T{k}"] = (quote, nf.derive_bars(bars))
+
+    panel = {row['Ticker']: row for row in compute_panel_rows(inputs, 'ts')}
+    for ticker, (quote, bars) in inputs.items():
+        assert panel[ticker] == nf.build_ticker_row(ticker, 'ts', quote, bars), ticker
+
+
+@pytest.mark.parametrize('sliding', [False, True])
+def test_incremental_state_matches_batch(sliding):
+    full = make_bars(days=6, seed=1)
+    nf._INDICATOR_STATES.clear()
+
+    # Refreshes every 7 bars; the newest bar is still forming and differs from its final value
+    for end in range(300, len(full) + 1, 7):
+        window = full.iloc[max(0, end - 375) if sliding else 0:end].copy()
+        window.iloc[-1, window.columns.get_loc('Close')] += 0.05
+        rsi, vwap, stdev, supertrend = nf.update_indicator_state('X', window)
+
+        assert rsi == pytest.approx(nf.calculate_rsi(window['Close']), abs=0.01)
+        assert (vwap, stdev) == pytest.approx(nf.session_vwap(window))
+        if not sliding:
+            # Once the window slides, Supertrend is an approximation (see the Incremental Indicator State note)
+            assert supertrend == nf.calculate_supertrend(window)
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from screener import ScreenerError, evaluate, screen
+
+
+@pytest.fixture
+def snapshot():
+    return pd.DataFrame({
+        'Ticker': ['AB', 'CD'],
+        'Current Price': [100.0, 250.0],
+        'RSI (5 Min)': [25.0, 70.0],
+        'Supertrend': pd.Categorical(['Bullish', 'Bearish']),
+    })
+
+
+def test_numeric_arithmetic_is_allowed(snapshot):
+    assert screen('Price * 2 > 300 and RSI < 80', snapshot)['Ticker'].tolist() == ['CD']
+
+
+@pytest.mark.parametrize('expression', [
+    'Ticker * 3 == "ABABAB"',
+    'Ticker * 100000000 == "x"',
+    '3 * Supertrend == "x"',
+    '-Ticker == "x"',
+])
+def test_arithmetic_on_text_columns_is_rejected(snapshot, expression):
+    with pytest.raises(ScreenerError, match="numeric"):
+        evaluate(expression, snapshot)
+
+
+def test_text_columns_still_compare(snapshot):
+    assert screen('Supertrend == "Bullish" and Ticker in ["AB"]', snapshot)['Ticker'].tolist() == ['AB']
@@ -0,0 +1,104 @@
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+import pandas as pd
+
+# --- Trader Zone Calculator ---
+# Once per snapshot version, sentiment and level pair, the matching rows are sliced into numpy
+# arrays and ordered by Spread %. A query for (capital, sentiment, risk, levels) is then a few
+# vectorized ops over the TOP_N picked rows, memoized in a small LRU. Changing the capital input
+# never touches the snapshot frame.
+
+LEVERAGE = 4
+TOP_N = 15
+STOP_FRACTION = 0.10    # "Stop Loss (Risk)" = 10% of the projected profit
+CACHE_ENTRIES = 16
+PICKS_ENTRIES = 64
+
+RESULT_COLUMNS = ['Ticker', 'Current Price', 'Leveraged Qty', 'Achieved Price', 'Estimated Profit', 'Stop Loss (Risk)']
+
+# Arrays are ordered by Spread % (ascending = Safe, descending = Risky). Rows with a missing or
+# non-positive level (no previous session, 0.0 Support/Resistance defaults) are excluded.
+Candidates = namedtuple('Candidates', ['ticker', 'price', 'target', 'safe', 'risky'])
+
+_CANDIDATES = OrderedDict()
+_PICKS = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+def build_candidates(df, sentiment, upper_col, lower_col):
+    """Snapshot rows on the sentiment's side of VWAP with a price and both levels -> Candidates"""
+    rows = df
+    if 'Intraday Trend' in df.columns:
+        rows = df[(df['Intraday Trend'] == sentiment).to_numpy()]
+
+    price = rows['Current Price'].to_numpy(dtype='float64')
+    upper = rows[upper_col].to_numpy(dtype='float64')
+    lower = rows[lower_col].to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = (upper - lower) / price
+    # NaN compares False, so missing levels drop out here too
+    keep = (price > 0) & (upper > 0) & (lower > 0) & ~np.isnan(spread)
+
+    ticker = rows['Link'] if 'Link' in rows.columns else rows['Ticker']
+    ticker, price, spread = ticker.to_numpy()[keep], price[keep], spread[keep]
+    target = (upper if sentiment == "Bullish" else lower)[keep]
+
+    # Stable sorts keep snapshot order among equal spreads, like nsmallest/nlargest(keep='first')
+    safe = np.argsort(spread, kind='stable')[:TOP_N]
+    risky = np.argsort(-spread, kind='stable')[:TOP_N]
+    return Candidates(ticker, price, target, safe, risky)
+
+def get_candidates(df, version, sentiment, upper_col, lower_col):
+    """Candidates cached per (version, sentiment, levels); the snapshot is sliced once however often it is queried"""
+    key = (version, sentiment, upper_col, lower_col)
+    with _CACHE_LOCK:
+        cached = _CANDIDATES.get(key)
+    if cached is not None:
+        return cached
+
+    candidates = build_candidates(df, sentiment, upper_col, lower_col)
+    logging.info(f"Trader Zone: {len(candidates.price)} {sentiment} candidates for {version} ({upper_col}/{lower_col})")
+    with _CACHE_LOCK:
+        _CANDIDATES[key] = candidates
+        while len(_CANDIDATES) > CACHE_ENTRIES:
+            _CANDIDATES.popitem(last=False)
+    return candidates
+
+def compute_picks(candidates, capital, sentiment, risk):
+    """Quantity, target and profit for the TOP_N rows of one side -> frame of RESULT_COLUMNS"""
+    order = candidates.risky if risk == "Risky" else candidates.safe
+    price, target = candidates.price[order], candidates.target[order]
+
+    qty = np.floor(capital * LEVERAGE / price)
+    direction = 1.0 if sentiment == "Bullish" else -1.0
+    # A target on the wrong side of the price projects zero profit, not a loss
+    profit = np.maximum((target - price) * direction * qty, 0.0)
+    return pd.DataFrame({
+        'Ticker': candidates.ticker[order],
+        'Current Price': price,
+        'Leveraged Qty': qty.astype('int64'),
+        'Achieved Price': target,
+        'Estimated Profit': profit,
+        'Stop Loss (Risk)': profit * STOP_FRACTION,
+    }, columns=RESULT_COLUMNS)
+
+def trader_picks(df, version, capital, sentiment="Bullish", risk="Safe", upper_col='Resistance', lower_col='Support'):
+    """
+    Top TOP_N picks for one Trader Zone query -> frame of RESULT_COLUMNS.
+    Results sit in a small LRU keyed by the inputs, so the returned frame is shared and must not be modified.
+    """
+    key = (version, sentiment, upper_col, lower_col, float(capital), risk)
+    with _CACHE_LOCK:
+        cached = _PICKS.get(key)
+        if cached is not None:
+            _PICKS.move_to_end(key)
+            return cached
+
+    candidates = get_candidates(df, version, sentiment, upper_col, lower_col)
+    result = compute_picks(candidates, float(capital), sentiment, risk)
+    with _CACHE_LOCK:
+        _PICKS[key] = result
+        while len(_PICKS) > PICKS_ENTRIES:
+            _PICKS.popitem(last=False)
+    return result